@@ -0,0 +1,163 @@
+from placement import Placement, board_rows, enumerate_placements, game_placements
+from tetris import HEIGHT, WIDTH
+from transposition import TABLE_SIZE, TranspositionTable, board_hash, place_hash
+
+FULL_ROW = (1 << WIDTH) - 1
+BEAM_WIDTH = 6
+WEIGHTS = {
+    "height": -0.51,
+    "lines": 0.76,
+    "holes": -0.36,
+    "bumpiness": -0.18,
+}
+
+
+def place(rows: tuple[int, ...], tiles_pos: tuple) -> tuple[tuple[int, ...], int]:
+    new_rows = list(rows)
+    for y, x in tiles_pos:
+        new_rows[y] |= 1 << x
+
+    kept_rows = [row for row in new_rows if row != FULL_ROW]
+    lines = len(new_rows) - len(kept_rows)
+    return (0,) * lines + tuple(kept_rows), lines
+
+
+def next_action(path: tuple[str, ...]) -> str:
+    # Once only soft drops remain, a hard drop lands on the same spot
+    if all(move == "down" for move in path):
+        return "drop"
+    return path[0]
+
+
+def evaluate(rows: tuple[int, ...], lines: int, weights: dict = WEIGHTS) -> float:
+    heights = [0] * WIDTH
+    covered = 0
+    holes = 0
+    for y, row in enumerate(rows):
+        new_cells = row & ~covered
+        while new_cells:
+            lowest_bit = new_cells & -new_cells
+            heights[lowest_bit.bit_length() - 1] = HEIGHT - y
+            new_cells ^= lowest_bit
+        holes += (covered & ~row).bit_count()
+        covered |= row
+
+    bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+    return (
+        weights["height"] * sum(heights)
+        + weights["lines"] * lines
+        + weights["holes"] * holes
+        + weights["bumpiness"] * bumpiness
+    )
+
+
+class TetrisAI:
+    def __init__(
+        self,
+        beam_width: int = BEAM_WIDTH,
+        weights: dict = WEIGHTS,
+        table_size: int = TABLE_SIZE,
+    ) -> None:
+        self._beam_width = beam_width
+        self._weights = weights
+        self._evaluations = TranspositionTable(table_size)
+        self._target = None
+        self._target_tetromino = None
+        self._path_index = 0
+
+    def _expand(
+        self, rows: tuple[int, ...], key: int, placement: Placement
+    ) -> tuple[tuple[int, ...], int, float, int]:
+        new_rows, lines = place(rows, placement.tiles_pos)
+        # Zobrist keys update in place unless rows shifted after a clear
+        if lines:
+            new_key = board_hash(new_rows)
+        else:
+            new_key = place_hash(key, placement.tiles_pos)
+
+        board_score = self._evaluations.get(new_key)
+        if board_score is None:
+            board_score = evaluate(new_rows, 0, self._weights)
+            self._evaluations.put(new_key, board_score)
+        return new_rows, new_key, board_score, lines
+
+    def search(
+        self,
+        rows: tuple[int, ...],
+        placements: tuple[Placement, ...],
+        preview: list[str],
+    ) -> Placement | None:
+        # Each beam entry is (score, rows, board key, lines so far, first placement)
+        lines_weight = self._weights["lines"]
+        key = board_hash(rows)
+        beam = []
+        for placement in placements:
+            new_rows, new_key, board_score, lines = self._expand(rows, key, placement)
+            score = board_score + lines_weight * lines
+            beam.append((score, new_rows, new_key, lines, placement))
+
+        for piece_type in preview:
+            beam.sort(key=lambda entry: entry[0], reverse=True)
+            next_beam = []
+            for _, beam_rows, beam_key, beam_lines, first_placement in beam[
+                : self._beam_width
+            ]:
+                for placement in enumerate_placements(beam_rows, piece_type):
+                    new_rows, new_key, board_score, lines = self._expand(
+                        beam_rows, beam_key, placement
+                    )
+                    lines += beam_lines
+                    score = board_score + lines_weight * lines
+                    next_beam.append((score, new_rows, new_key, lines, first_placement))
+            if not next_beam:
+                break
+            beam = next_beam
+
+        if not beam:
+            return None
+        return max(beam, key=lambda entry: entry[0])[4]
+
+    def choose(self, game) -> Placement | None:
+        rows = board_rows(game.settled)
+        preview = [game.bag.next_piece] if game.bag.next_piece else []
+        return self.search(rows, game_placements(game), preview)
+
+    def __call__(self, game) -> str | None:
+        if game.is_game_over:
+            return None
+
+        tetromino = game.current_tetromino
+        if self._target_tetromino is not tetromino:
+            self._target = self.choose(game)
+            self._target_tetromino = tetromino
+            self._path_index = 0
+        if self._target is None:
+            return "down"
+
+        # Follow the stored path while the piece is on it; gravity can only
+        # skip ahead along its soft drops
+        state = (*tetromino.rotate_point, tetromino.rotate_index)
+        states = self._target.states
+        if state in states[self._path_index :]:
+            return self._follow(states.index(state, self._path_index))
+
+        # Knocked off the path, so search again from where the piece is
+        target_tiles = frozenset(self._target.tiles_pos)
+        for placement in game_placements(game):
+            if frozenset(placement.tiles_pos) == target_tiles:
+                self._target = placement
+                return self._follow(0)
+
+        self._target = self.choose(game)
+        return self._follow(0) if self._target else "down"
+
+    def _follow(self, path_index: int) -> str:
+        self._path_index = path_index + 1
+        return next_action(self._target.path[path_index:])
+
+
+DEFAULT_AI = TetrisAI()
+
+
+def ai_policy(game) -> str | None:
+    return DEFAULT_AI(game)
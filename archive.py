@@ -0,0 +1,217 @@
+import mmap
+import os
+import struct
+import numpy as np
+from replay import Replay
+
+ARCHIVE_MAGIC = b"PTRA"
+ARCHIVE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sB")
+INDEX_MAGIC = b"PTRI"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sB3x")
+# player, mode, seed, score, lines, level, time in seconds, replay length
+ENTRY_HEADER = struct.Struct("<16s12sQIHHdI")
+
+# Records of the sidecar .idx file, one per replay, in append order
+INDEX_DTYPE = np.dtype(
+    [
+        ("player", "<U16"),
+        ("mode", "<U12"),
+        ("seed", "<u8"),
+        ("score", "<u4"),
+        ("lines", "<u2"),
+        ("level", "<u2"),
+        ("time", "<f8"),
+        ("offset", "<u8"),
+        ("length", "<u4"),
+    ]
+)
+
+
+class ReplayArchive:
+    def __init__(self, file_path: str) -> None:
+        self._file_path = file_path
+        self._index_path = file_path + ".idx"
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            with open(file_path, "wb") as file:
+                file.write(FILE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION))
+
+        self._file = open(file_path, "rb")
+        self._map = None
+        self._index_file = None
+        self._index_map = None
+        self._index = None
+        self._remap()
+        magic, version = FILE_HEADER.unpack_from(self._map)
+        if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+            raise ValueError("not a PyTetris replay archive")
+        if not self._index_is_current():
+            self._rebuild_index()
+        self._remap_index()
+
+    def _remap(self) -> mmap.mmap:
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _remap_index(self) -> None:
+        # The old map is left to the garbage collector, since index arrays
+        # handed out earlier may still be views onto it
+        self._index = None
+        if self._index_file is None:
+            self._index_file = open(self._index_path, "rb")
+        self._index_map = mmap.mmap(
+            self._index_file.fileno(), 0, access=mmap.ACCESS_READ
+        )
+
+    def _index_is_current(self) -> bool:
+        # The last record must end exactly where the archive ends
+        if not os.path.exists(self._index_path):
+            return False
+        with open(self._index_path, "rb") as file:
+            header = file.read(INDEX_HEADER.size)
+            if len(header) != INDEX_HEADER.size or header != INDEX_HEADER.pack(
+                INDEX_MAGIC, INDEX_VERSION
+            ):
+                return False
+            size = os.path.getsize(self._index_path) - INDEX_HEADER.size
+            if size % INDEX_DTYPE.itemsize:
+                return False
+            if not size:
+                return len(self._map) == FILE_HEADER.size
+            file.seek(-INDEX_DTYPE.itemsize, os.SEEK_END)
+            last = np.frombuffer(file.read(INDEX_DTYPE.itemsize), INDEX_DTYPE)[0]
+        return int(last["offset"]) + int(last["length"]) == len(self._map)
+
+    def _rebuild_index(self) -> None:
+        # Recovery only: hop from entry header to entry header of the archive
+        entries = []
+        offset = FILE_HEADER.size
+        while offset < len(self._map):
+            entry = ENTRY_HEADER.unpack_from(self._map, offset)
+            offset += ENTRY_HEADER.size
+            entries.append(self._decode_entry(entry, offset))
+            offset += entry[-1]
+
+        with open(self._index_path, "wb") as file:
+            file.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION))
+            file.write(np.array(entries, dtype=INDEX_DTYPE).tobytes())
+
+    def _decode_entry(self, entry: tuple, offset: int) -> tuple:
+        player, mode, seed, score, lines, level, time_taken, length = entry
+        return (
+            player.rstrip(b"\0").decode(errors="ignore"),
+            mode.rstrip(b"\0").decode(errors="ignore"),
+            seed,
+            score,
+            lines,
+            level,
+            time_taken,
+            offset,
+            length,
+        )
+
+    def append(
+        self,
+        replay: Replay,
+        player: str,
+        mode: str,
+        score: int,
+        lines: int,
+        level: int,
+        time_taken: float,
+    ) -> int:
+        payload = replay.to_bytes()
+        entry = (
+            player.encode()[:16],
+            mode.encode()[:12],
+            replay.seed,
+            score,
+            lines,
+            level,
+            time_taken,
+            len(payload),
+        )
+        with open(self._file_path, "ab") as file:
+            offset = file.tell() + ENTRY_HEADER.size
+            file.write(ENTRY_HEADER.pack(*entry))
+            file.write(payload)
+        with open(self._index_path, "ab") as file:
+            record = np.array([self._decode_entry(entry, offset)], dtype=INDEX_DTYPE)
+            file.write(record.tobytes())
+
+        self._remap()
+        self._remap_index()
+        return len(self) - 1
+
+    def append_game(self, game, player: str, mode: str, time_taken: float) -> int:
+        return self.append(
+            Replay.from_game(game),
+            player,
+            mode,
+            game.score,
+            game.total_clear_line,
+            game.level,
+            time_taken,
+        )
+
+    def read(self, entry_index: int) -> Replay:
+        entry = self.index[entry_index]
+        offset = int(entry["offset"])
+        return Replay.from_bytes(self._map[offset : offset + int(entry["length"])])
+
+    def query(
+        self, player: str | None = None, mode: str | None = None, seed=None
+    ) -> np.ndarray:
+        index = self.index
+        mask = np.ones(len(index), dtype=bool)
+        if player is not None:
+            mask &= index["player"] == player
+        if mode is not None:
+            mask &= index["mode"] == mode
+        if seed is not None:
+            mask &= index["seed"] == seed
+        return np.flatnonzero(mask)
+
+    def best_times(self, mode: str, count: int = 10, min_lines: int = 0) -> np.ndarray:
+        matches = self.query(mode=mode)
+        matches = matches[self.index["lines"][matches] >= min_lines]
+        order = np.argsort(self.index["time"][matches], kind="stable")
+        return matches[order[:count]]
+
+    def best_scores(self, mode: str, count: int = 10) -> np.ndarray:
+        matches = self.query(mode=mode)
+        order = np.argsort(
+            -self.index["score"][matches].astype(np.int64), kind="stable"
+        )
+        return matches[order[:count]]
+
+    def close(self) -> None:
+        self._index = None
+        self._index_map = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+        if self._index_file is not None:
+            self._index_file.close()
+
+    def __enter__(self) -> "ReplayArchive":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def index(self) -> np.ndarray:
+        # A read-only view straight onto the mapped .idx file, nothing decoded
+        if self._index is None:
+            self._index = np.frombuffer(
+                self._index_map, INDEX_DTYPE, offset=INDEX_HEADER.size
+            )
+        return self._index
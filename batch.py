@@ -0,0 +1,237 @@
+import numpy as np
+from tetris import (
+    ACTIONS,
+    HEIGHT,
+    OFFSET_I,
+    OFFSET_JLSTZ,
+    PIECES,
+    PIECES_INDEX,
+    ROTATION_STATES,
+    SPAWN_POINTS,
+    WIDTH,
+    Bag,
+)
+
+NOOP = -1
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+SCORE_TABLE = np.array([0, 40, 100, 300, 1200])
+SEQUENCE_BAGS = 64
+
+
+def build_piece_tables() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Indexed by board value (1-7), row 0 is unused padding
+    cells = np.zeros((len(PIECES) + 1, 4, 4, 2), dtype=np.int16)
+    kicks = np.zeros((len(PIECES) + 1, 4, 2, 5, 2), dtype=np.int16)
+    spawn = np.zeros((len(PIECES) + 1, 2), dtype=np.int16)
+
+    for piece_type, index in PIECES_INDEX.items():
+        offset_table = OFFSET_I if piece_type == "I" else OFFSET_JLSTZ
+        spawn[index] = SPAWN_POINTS[piece_type]
+        for rotate_index in range(4):
+            cells[index, rotate_index] = ROTATION_STATES[piece_type][rotate_index]
+            for direction_index, rotation_step in enumerate((1, -1)):
+                next_rotate_index = (rotate_index + rotation_step) % 4
+                key = f"{rotate_index}>{next_rotate_index}"
+                kicks[index, rotate_index, direction_index] = [
+                    (offset_y, offset_x) for offset_x, offset_y in offset_table[key]
+                ]
+
+    return cells, kicks, spawn
+
+
+PIECE_CELLS, PIECE_KICKS, SPAWN_POS = build_piece_tables()
+
+
+class BatchTetris:
+    def __init__(
+        self, game_count: int, seeds: list | None = None, level: int = 1
+    ) -> None:
+        if seeds is None:
+            seeds = [None] * game_count
+        self._game_count = game_count
+        self._bags = [Bag(seed) for seed in seeds]
+        self._boards = np.zeros((game_count, HEIGHT, WIDTH), dtype=np.uint8)
+        self._sequences = np.empty((game_count, 0), dtype=np.uint8)
+        self._sequence_index = np.zeros(game_count, dtype=np.int64)
+        self._piece = np.zeros(game_count, dtype=np.int64)
+        self._rotation = np.zeros(game_count, dtype=np.int64)
+        self._position = np.zeros((game_count, 2), dtype=np.int64)
+        self._game_over = np.zeros(game_count, dtype=bool)
+        self._total_clear_line = np.zeros(game_count, dtype=np.int64)
+        self._level = np.full(game_count, level, dtype=np.int64)
+        self._level_progression = np.zeros(game_count, dtype=np.int64)
+        self._score = np.zeros(game_count, dtype=np.int64)
+        self._spawn(np.arange(game_count))
+
+    def _extend_sequences(self) -> None:
+        # Pieces every game has already dealt are dropped before growing
+        consumed = self._sequence_index.min()
+        if consumed:
+            self._sequences = self._sequences[:, consumed:]
+            self._sequence_index -= consumed
+        extension = np.stack(
+            [bag.generate_sequence(SEQUENCE_BAGS) for bag in self._bags]
+        )
+        self._sequences = np.concatenate((self._sequences, extension), axis=1)
+
+    def _cells(self, games: np.ndarray, rotation: np.ndarray, position: np.ndarray):
+        return position[:, None, :] + PIECE_CELLS[self._piece[games], rotation]
+
+    def _fits(self, games: np.ndarray, cells: np.ndarray) -> np.ndarray:
+        ys, xs = cells[..., 0], cells[..., 1]
+        inside = (ys >= 0) & (ys < HEIGHT) & (xs >= 0) & (xs < WIDTH)
+        occupied = (
+            self._boards[
+                games[:, None], np.clip(ys, 0, HEIGHT - 1), np.clip(xs, 0, WIDTH - 1)
+            ]
+            != 0
+        )
+        return (inside & ~occupied).all(axis=-1)
+
+    def _spawn(self, games: np.ndarray) -> None:
+        if (self._sequence_index[games] >= self._sequences.shape[1]).any():
+            self._extend_sequences()
+        self._piece[games] = self._sequences[games, self._sequence_index[games]]
+        self._sequence_index[games] += 1
+        self._rotation[games] = 0
+        self._position[games] = SPAWN_POS[self._piece[games]]
+
+        cells = self._cells(games, self._rotation[games], self._position[games])
+        self._game_over[games] |= ~self._fits(games, cells)
+
+    def _shift(self, games: np.ndarray, dy: int, dx: int) -> None:
+        position = self._position[games] + (dy, dx)
+        fits = self._fits(games, self._cells(games, self._rotation[games], position))
+        self._position[games[fits]] = position[fits]
+        if dy:
+            self._lock(games[~fits])
+
+    def _hard_drop(self, games: np.ndarray) -> None:
+        cells = self._cells(games, self._rotation[games], self._position[games])
+        filled = self._boards[games] != 0
+        tops = np.where(filled.any(axis=1), filled.argmax(axis=1), HEIGHT)
+        cell_tops = tops[np.arange(len(games))[:, None], cells[..., 1]]
+
+        # Pieces above every column top fall straight onto the surface
+        above = (cells[..., 0] < cell_tops).all(axis=1)
+        distance = (cell_tops - 1 - cells[..., 0]).min(axis=1)
+        self._position[games[above], 0] += distance[above]
+
+        # Pieces tucked under an overhang step down until they stop fitting
+        tucked = games[~above]
+        while len(tucked):
+            position = self._position[tucked] + (1, 0)
+            fits = self._fits(
+                tucked, self._cells(tucked, self._rotation[tucked], position)
+            )
+            self._position[tucked[fits]] = position[fits]
+            tucked = tucked[fits]
+        self._lock(games)
+
+    def _rotate(self, games: np.ndarray, direction_index: int) -> None:
+        games = games[self._piece[games] != PIECES_INDEX["O"]]
+        rotation = self._rotation[games]
+        next_rotation = (rotation + (1 if direction_index == 0 else -1)) % 4
+        kicks = PIECE_KICKS[self._piece[games], rotation, direction_index]
+
+        # Try all five kicks at once and keep the first one that fits
+        cells = self._cells(games, next_rotation, self._position[games])
+        kicked_cells = cells[:, None, :, :] + kicks[:, :, None, :]
+        fits = self._fits(games[:, None], kicked_cells)
+        rotated = fits.any(axis=1)
+        first_kick = fits.argmax(axis=1)
+
+        games = games[rotated]
+        self._rotation[games] = next_rotation[rotated]
+        self._position[games] += kicks[rotated, first_kick[rotated]]
+
+    def _lock(self, games: np.ndarray) -> None:
+        if not len(games):
+            return
+        cells = self._cells(games, self._rotation[games], self._position[games])
+        self._boards[games[:, None], cells[..., 0], cells[..., 1]] = self._piece[
+            games, None
+        ]
+        self._clear_lines(games)
+        self._spawn(games)
+
+    def _clear_lines(self, games: np.ndarray) -> None:
+        boards = self._boards[games]
+        keep = ~boards.all(axis=2)
+        cleared = HEIGHT - keep.sum(axis=1)
+        if not cleared.any():
+            return
+
+        # Stable sort moves full rows to the top, then blank them out
+        order = np.argsort(keep, axis=1, kind="stable")
+        boards = np.take_along_axis(boards, order[:, :, None], axis=1)
+        boards[np.arange(HEIGHT)[None, :] < cleared[:, None]] = 0
+        self._boards[games] = boards
+
+        self._total_clear_line[games] += cleared
+        self._level_progression[games] += cleared
+        level_up = self._level_progression[games] >= 10
+        self._level[games] += level_up
+        self._level_progression[games] %= 10
+        self._score[games] += self._level[games] * SCORE_TABLE[cleared]
+
+    def step(self, actions) -> None:
+        actions = np.broadcast_to(np.asarray(actions), (self._game_count,))
+        for code, action in enumerate(ACTIONS):
+            games = np.flatnonzero((actions == code) & ~self._game_over)
+            if not len(games):
+                continue
+            if action == "left":
+                self._shift(games, 0, -1)
+            elif action == "right":
+                self._shift(games, 0, 1)
+            elif action == "down":
+                self._shift(games, 1, 0)
+            elif action == "drop":
+                self._hard_drop(games)
+            else:
+                self._rotate(games, 0 if action == "CW" else 1)
+
+    def tick(self) -> None:
+        self.step(ACTION_CODES["down"])
+
+    def render(self) -> np.ndarray:
+        boards = self._boards.copy()
+        games = np.flatnonzero(~self._game_over)
+        cells = self._cells(games, self._rotation[games], self._position[games])
+        boards[games[:, None], cells[..., 0], cells[..., 1]] = self._piece[games, None]
+        return boards
+
+    @property
+    def game_count(self) -> int:
+        return self._game_count
+
+    @property
+    def boards(self) -> np.ndarray:
+        return self._boards
+
+    @property
+    def pieces(self) -> np.ndarray:
+        return self._piece
+
+    @property
+    def next_pieces(self) -> np.ndarray:
+        if (self._sequence_index >= self._sequences.shape[1]).any():
+            self._extend_sequences()
+        return self._sequences[np.arange(self._game_count), self._sequence_index]
+
+    @property
+    def game_over(self) -> np.ndarray:
+        return self._game_over
+
+    @property
+    def total_clear_line(self) -> np.ndarray:
+        return self._total_clear_line
+
+    @property
+    def level(self) -> np.ndarray:
+        return self._level
+
+    @property
+    def score(self) -> np.ndarray:
+        return self._score
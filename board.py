@@ -0,0 +1,166 @@
+import numpy as np
+
+
+class BitBoard:
+    def __init__(self, width: int, height: int) -> None:
+        self._width = width
+        self._height = height
+        self._full_row = (1 << width) - 1
+        self._rows = [0] * height
+        self._colors = np.zeros((height, width), dtype=np.uint8)
+        self._heights = [0] * width
+
+    def __getitem__(self, pos: tuple[int, int]) -> int:
+        y, x = pos
+        return int(self._colors[y, x]) if self._rows[y] >> x & 1 else 0
+
+    def is_occupied(self, y: int, x: int) -> bool:
+        return bool(self._rows[y] >> x & 1)
+
+    def collides(self, tiles_pos: list) -> bool:
+        for y, x in tiles_pos:
+            if not (0 <= y < self._height and 0 <= x < self._width):
+                return True
+            if self._rows[y] >> x & 1:
+                return True
+        return False
+
+    def place(self, tiles_pos: list, value: int) -> None:
+        for y, x in tiles_pos:
+            self._rows[y] |= 1 << x
+            self._colors[y, x] = value
+            self._heights[x] = max(self._heights[x], self._height - y)
+
+    def full_rows(self) -> list[int]:
+        return [y for y, row in enumerate(self._rows) if row == self._full_row]
+
+    def clear_rows(self, rows: list[int]) -> None:
+        if not rows:
+            return
+        cleared = set(rows)
+        keep = [y for y in range(self._height) if y not in cleared]
+        self._rows = [0] * len(cleared) + [self._rows[y] for y in keep]
+        self._colors = np.vstack(
+            (np.zeros((len(cleared), self._width), dtype=np.uint8), self._colors[keep])
+        )
+        self._update_heights()
+
+    def clear_full_rows(self) -> int:
+        lines_to_clear = self.full_rows()
+        self.clear_rows(lines_to_clear)
+        return len(lines_to_clear)
+
+    def push_rows(self, colors: np) -> None:
+        # New rows come in at the bottom and push the stack up
+        count = len(colors)
+        masks = [sum(1 << x for x in np.flatnonzero(row).tolist()) for row in colors]
+        self._rows = self._rows[count:] + masks
+        self._colors = np.vstack((self._colors[count:], colors.astype(np.uint8)))
+        self._update_heights()
+
+    def _update_heights(self) -> None:
+        # Topmost cell of each column, scanning down until every column is hit
+        heights = [0] * self._width
+        covered = 0
+        for y, row in enumerate(self._rows):
+            new_cells = row & ~covered
+            while new_cells:
+                lowest_bit = new_cells & -new_cells
+                heights[lowest_bit.bit_length() - 1] = self._height - y
+                new_cells ^= lowest_bit
+            covered |= row
+            if covered == self._full_row:
+                break
+        self._heights = heights
+
+    def copy(self) -> "BitBoard":
+        other = BitBoard(self._width, self._height)
+        other._rows = list(self._rows)
+        other._colors = self._colors.copy()
+        other._heights = list(self._heights)
+        return other
+
+    @property
+    def rows(self) -> list[int]:
+        return self._rows
+
+    @property
+    def heights(self) -> list[int]:
+        return self._heights
+
+    @property
+    def colors(self) -> np:
+        return self._colors
+
+
+class ArrayBoard:
+    def __init__(self, width: int, height: int) -> None:
+        self._width = width
+        self._height = height
+        self._colors = np.zeros((height, width), dtype=np.uint8)
+        self._heights = [0] * width
+
+    def __getitem__(self, pos: tuple[int, int]) -> int:
+        return int(self._colors[pos])
+
+    def is_occupied(self, y: int, x: int) -> bool:
+        return self._colors[y, x] != 0
+
+    def collides(self, tiles_pos: list) -> bool:
+        for y, x in tiles_pos:
+            if not (0 <= y < self._height and 0 <= x < self._width):
+                return True
+            if self._colors[y, x] != 0:
+                return True
+        return False
+
+    def place(self, tiles_pos: list, value: int) -> None:
+        for y, x in tiles_pos:
+            self._colors[y, x] = value
+            self._heights[x] = max(self._heights[x], self._height - y)
+
+    def full_rows(self) -> list[int]:
+        return np.flatnonzero(self._colors.all(axis=1)).tolist()
+
+    def clear_rows(self, rows: list[int]) -> None:
+        keep = np.ones(self._height, dtype=bool)
+        keep[rows] = False
+        self._compact(keep)
+
+    def clear_full_rows(self) -> int:
+        keep = ~self._colors.all(axis=1)
+        return self._compact(keep)
+
+    def _compact(self, keep: np) -> int:
+        cleared = self._height - int(np.count_nonzero(keep))
+        if cleared:
+            self._colors[cleared:] = self._colors[keep]
+            self._colors[:cleared] = 0
+            self._update_heights()
+        return cleared
+
+    def push_rows(self, colors: np) -> None:
+        count = len(colors)
+        self._colors[:-count] = self._colors[count:].copy()
+        self._colors[-count:] = colors
+        self._update_heights()
+
+    def _update_heights(self) -> None:
+        filled = self._colors != 0
+        self._heights = np.where(
+            filled.any(axis=0), self._height - filled.argmax(axis=0), 0
+        ).tolist()
+
+    def copy(self) -> "ArrayBoard":
+        other = ArrayBoard(self._width, self._height)
+        other._colors = self._colors.copy()
+        other._heights = list(self._heights)
+        return other
+
+    @property
+    def colors(self) -> np:
+        return self._colors
+
+    @property
+    def heights(self) -> list[int]:
+        return self._heights
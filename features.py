@@ -0,0 +1,62 @@
+import numpy as np
+from tetris import WIDTH
+
+FEATURE_NAMES = [f"height_{col}" for col in range(WIDTH)] + [
+    "aggregate_height",
+    "max_height",
+    "holes",
+    "bumpiness",
+    "row_transitions",
+    "column_transitions",
+    "well_depth",
+    "max_well_depth",
+]
+
+
+def extract_features(boards: np.ndarray) -> np.ndarray:
+    # Boards are top row first, like Tetris.settled.colors and BatchTetris.boards
+    filled = np.asarray(boards) != 0
+    single_board = filled.ndim == 2
+    if single_board:
+        filled = filled[None]
+    count, height, width = filled.shape
+
+    has_block = filled.any(axis=1)
+    heights = np.where(has_block, height - filled.argmax(axis=1), 0)
+
+    covered = np.logical_or.accumulate(filled, axis=1)
+    holes = (covered & ~filled).sum(axis=(1, 2))
+
+    bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+
+    # Walls count as filled for row transitions, the floor for column ones
+    walls = np.ones((count, height, 1), dtype=bool)
+    rows = np.concatenate((walls, filled, walls), axis=2)
+    row_transitions = (rows[:, :, 1:] != rows[:, :, :-1]).sum(axis=(1, 2))
+    floor = np.ones((count, 1, width), dtype=bool)
+    columns = np.concatenate((filled, floor), axis=1)
+    column_transitions = (columns[:, 1:] != columns[:, :-1]).sum(axis=(1, 2))
+
+    wall_heights = np.full((count, 1), height)
+    padded_heights = np.concatenate((wall_heights, heights, wall_heights), axis=1)
+    neighbour_heights = np.minimum(padded_heights[:, :-2], padded_heights[:, 2:])
+    wells = np.clip(neighbour_heights - heights, 0, None)
+
+    features = np.column_stack(
+        (
+            heights,
+            heights.sum(axis=1),
+            heights.max(axis=1),
+            holes,
+            bumpiness,
+            row_transitions,
+            column_transitions,
+            wells.sum(axis=1),
+            wells.max(axis=1),
+        )
+    ).astype(np.float32)
+    return features[0] if single_board else features
+
+
+def game_features(game) -> np.ndarray:
+    return extract_features(game.settled.colors)
@@ -8,6 +8,8 @@ from kivy.uix.screenmanager import Screen, ScreenManager
 from kivy.core.window import Window
 from screen.modeClassic import TetrisApp
 from screen.mode40Line import Tetris40LineApp
+from screen.modeUltra import TetrisUltraApp
+from screen.modeDig import TetrisDigApp
 from screen.HowToPlay import HowToPlayScreen
 
 SCREEN_RESOLUTION = (2880, 1800)
@@ -34,6 +36,8 @@ class MenuScreen(Screen):
 
         btn_start = self.create_button("CLASSIC", (0.1, 0.7, 0.3, 1), self.start_game)
         btn_40line = self.create_button("40 LINES", (0.1, 1, 0.3, 1), self.start_40line)
+        btn_ultra = self.create_button("ULTRA", (0.9, 0.6, 0.1, 1), self.start_ultra)
+        btn_dig = self.create_button("DIG", (0.6, 0.4, 0.2, 1), self.start_dig)
         btn_high_scores = self.create_button(
             "HOW TO PLAY", (0.2, 0.6, 1, 1), self.how_to_play
         )
@@ -44,6 +48,8 @@ class MenuScreen(Screen):
         layout.add_widget(title)
         layout.add_widget(btn_start)
         layout.add_widget(btn_40line)
+        layout.add_widget(btn_ultra)
+        layout.add_widget(btn_dig)
         layout.add_widget(btn_high_scores)
         layout.add_widget(btn_exit)
         self.add_widget(layout)
@@ -67,39 +73,31 @@ class MenuScreen(Screen):
     def start_40line(self, instance):
         self.manager.current = "game_40line_screen"
 
+    def start_ultra(self, instance):
+        self.manager.current = "game_ultra_screen"
+
+    def start_dig(self, instance):
+        self.manager.current = "game_dig_screen"
+
     def how_to_play(self, instance):
         self.manager.current = "how_to_play_screen"
 
 
 class GameScreen(Screen):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.tetris_app = None  # Delay initialization
-
-    def on_enter(self, *args):
-        if self.tetris_app is None:
-            self.tetris_app = TetrisApp()
-            self.add_widget(self.tetris_app.build())
-
-    def on_leave(self, *args):
-        if self.tetris_app:
-            self.remove_widget(self.tetris_app.root)
-            self.tetris_app.stop()
-            self.tetris_app = None
-
-
-class Game40LineScreen(Screen):
-    def __init__(self, **kwargs):
+    def __init__(self, app_class=TetrisApp, **kwargs):
         super().__init__(**kwargs)
+        self.app_class = app_class
         self.tetris_app = None  # Delay initialization
 
     def on_enter(self, *args):
         if self.tetris_app is None:
-            self.tetris_app = Tetris40LineApp()
-            self.add_widget(self.tetris_app.build())
+            self.tetris_app = self.app_class()
+            self.tetris_app.root = self.tetris_app.build()
+            self.add_widget(self.tetris_app.root)
 
     def on_leave(self, *args):
         if self.tetris_app:
+            self.tetris_app.tetris_board.stop()
             self.remove_widget(self.tetris_app.root)
             self.tetris_app.stop()
             self.tetris_app = None
@@ -113,7 +111,9 @@ class TetrisMenuApp(App):
         sm = ScreenManager()
         sm.add_widget(MenuScreen(name="menu_screen"))
         sm.add_widget(GameScreen(name="game_screen"))
-        sm.add_widget(Game40LineScreen(name="game_40line_screen"))
+        sm.add_widget(GameScreen(Tetris40LineApp, name="game_40line_screen"))
+        sm.add_widget(GameScreen(TetrisUltraApp, name="game_ultra_screen"))
+        sm.add_widget(GameScreen(TetrisDigApp, name="game_dig_screen"))
         sm.add_widget(HowToPlayScreen(name="how_to_play_screen"))
         return sm
 
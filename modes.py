@@ -0,0 +1,104 @@
+import random
+import numpy as np
+from tetris import GARBAGE, HEIGHT, WIDTH, Tetris
+
+SPRINT_LINES = 40
+ULTRA_TIME_LIMIT = 120
+DIG_ROWS = 10
+
+
+class GameMode:
+    # Rules only read attributes that Tetris and GameSnapshot share, so the
+    # same mode works headless and from the Kivy board's published snapshots
+    name = "classic"
+    timed = False
+
+    def new_game(
+        self, width: int = WIDTH, height: int = HEIGHT, seed=None, **kwargs
+    ) -> Tetris:
+        # An int seed drives both the bag and the setup, so runs reproduce
+        if not isinstance(seed, int):
+            seed = (seed or random).getrandbits(32)
+        game = Tetris(width, height, seed=seed, **kwargs)
+        self.setup(game, random.Random(seed))
+        return game
+
+    def setup(self, game: Tetris, rng: random.Random) -> None:
+        pass
+
+    def is_won(self, state) -> bool:
+        return False
+
+    def is_lost(self, state) -> bool:
+        return state.is_game_over
+
+    def is_finished(self, state) -> bool:
+        return self.is_won(state) or self.is_lost(state)
+
+    def finish(self, state) -> tuple[int, int] | None:
+        # (frame, elapsed ns) at which the goal was reached
+        return None
+
+
+class SprintMode(GameMode):
+    name = "sprint"
+    timed = True
+
+    def __init__(self, lines: int = SPRINT_LINES) -> None:
+        self.lines = lines
+
+    def is_won(self, state) -> bool:
+        return state.total_clear_line >= self.lines
+
+    def finish(self, state) -> tuple[int, int] | None:
+        # Only the clear that crossed the goal counts, not one made after it
+        if state.last_clear is None:
+            return None
+        frame, elapsed_ns, total_lines, lines = state.last_clear
+        if total_lines - lines < self.lines <= total_lines:
+            return frame, elapsed_ns
+        return None
+
+
+class UltraMode(GameMode):
+    name = "ultra"
+    timed = True
+
+    def __init__(self, time_limit: float = ULTRA_TIME_LIMIT) -> None:
+        self.time_limit = time_limit
+
+    def is_won(self, state) -> bool:
+        return not state.is_game_over and state.play_time >= self.time_limit
+
+
+class DigMode(GameMode):
+    name = "dig"
+    timed = True
+
+    def __init__(self, rows: int = DIG_ROWS) -> None:
+        self.rows = rows
+
+    def setup(self, game: Tetris, rng: random.Random) -> None:
+        # Never put two holes in the same column back to back
+        holes = [rng.randrange(game.board.shape[1])]
+        while len(holes) < self.rows:
+            hole = rng.randrange(game.board.shape[1] - 1)
+            holes.append(hole + (hole >= holes[-1]))
+        game.add_garbage(holes)
+
+    def is_won(self, state) -> bool:
+        return not state.is_game_over and not np.any(state.board == GARBAGE)
+
+    def finish(self, state) -> tuple[int, int] | None:
+        # The last garbage row can only go with a line clear
+        if self.is_won(state) and state.last_clear is not None:
+            return state.last_clear[:2]
+        return None
+
+
+MODES = {
+    "classic": GameMode,
+    "sprint": SprintMode,
+    "ultra": UltraMode,
+    "dig": DigMode,
+}
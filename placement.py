@@ -0,0 +1,294 @@
+from functools import lru_cache, partial
+import numpy as np
+from tetris import ROTATION_STATES, ROTATION_TABLE, SPAWN_POINTS, WIDTH
+
+PLACEMENT_CACHE_SIZE = 4096
+FULL_ROW = (1 << WIDTH) - 1
+# Spare bits after each column, enough that no tile offset or kick carries a
+# position into the next column
+PAD = max(
+    [
+        abs(dy)
+        for rotation_states in ROTATION_STATES.values()
+        for offsets in rotation_states
+        for dy, _ in offsets
+    ]
+    + [abs(offset_y) for *_, kicks in ROTATION_TABLE.values() for _, offset_y in kicks]
+)
+
+
+def build_duplicates() -> dict:
+    # duplicates[piece_type][r] lists (earlier r, dy, dx) for the earlier
+    # rotations with the same shape: a rotate point (y, x) with rotation r
+    # covers the tiles of (y + dy, x + dx) with the earlier rotation
+    duplicates = {}
+    for piece_type, rotation_states in ROTATION_STATES.items():
+        corners = []
+        for offsets in rotation_states:
+            top = min(dy for dy, _ in offsets)
+            left = min(dx for _, dx in offsets)
+            shape = frozenset((dy - top, dx - left) for dy, dx in offsets)
+            corners.append((shape, top, left))
+        duplicates[piece_type] = [
+            [
+                (earlier, top - earlier_top, left - earlier_left)
+                for earlier, (earlier_shape, earlier_top, earlier_left) in enumerate(
+                    corners[:rotate_index]
+                )
+                if earlier_shape == shape
+            ]
+            for rotate_index, (shape, top, left) in enumerate(corners)
+        ]
+    return duplicates
+
+
+DUPLICATES = build_duplicates()
+
+
+@lru_cache(maxsize=None)
+def tiles_at(piece_type: str, rotate_index: int, y: int, x: int) -> tuple:
+    return tuple(
+        (y + dy, x + dx) for dy, dx in ROTATION_STATES[piece_type][rotate_index]
+    )
+
+
+class Placement:
+    def __init__(
+        self,
+        piece_type: str,
+        rotate_index: int,
+        rotate_point: tuple[int, int],
+        trace=None,
+    ) -> None:
+        self.piece_type = piece_type
+        self.rotate_index = rotate_index
+        self.rotate_point = rotate_point
+        self.tiles_pos = tiles_at(piece_type, rotate_index, *rotate_point)
+        # Paths are walked back from the search's parent records on first use,
+        # since callers only ever follow the placement they pick
+        self._trace = trace
+        self._path = None
+        self._states = None
+
+    @property
+    def path(self) -> tuple[str, ...]:
+        if self._path is None:
+            self._path, self._states = self._trace(self)
+        return self._path
+
+    @property
+    def states(self) -> tuple[tuple[int, int, int], ...]:
+        # (y, x, rotate_index) of the piece before each move of the path
+        if self._states is None:
+            self._path, self._states = self._trace(self)
+        return self._states
+
+    def __repr__(self) -> str:
+        return (
+            f"Placement({self.piece_type}, rotation={self.rotate_index}, "
+            f"tiles={self.tiles_pos})"
+        )
+
+
+def board_rows(board) -> tuple[int, ...]:
+    if isinstance(board, tuple):
+        return board
+    if hasattr(board, "rows"):
+        return tuple(board.rows)
+    colors = getattr(board, "colors", board)
+    occupied = np.asarray(colors) != 0
+    weights = 1 << np.arange(occupied.shape[1], dtype=np.int64)
+    return tuple(int(row) for row in occupied @ weights)
+
+
+@lru_cache(maxsize=None)
+def _columns(height: int) -> list[int]:
+    # columns[mask] moves bit x of a row mask to the top of column x
+    stride = height + PAD
+    return [
+        sum(1 << x * stride for x in range(WIDTH) if mask >> x & 1)
+        for mask in range(1 << WIDTH)
+    ]
+
+
+@lru_cache(maxsize=None)
+def _board_cells(height: int) -> int:
+    return sum(_columns(height)[FULL_ROW] << y for y in range(height))
+
+
+@lru_cache(maxsize=None)
+def _rotations(piece_type: str, stride: int) -> list[list[tuple]]:
+    # rotations[r] lists (action, next r, kick shifts) for each turn
+    rotations = [[] for _ in range(4)]
+    if piece_type != "O":
+        for rotate_index in range(4):
+            for direction in ("CW", "CCW"):
+                next_rotate_index, _, kicks = ROTATION_TABLE[
+                    piece_type, rotate_index, direction
+                ]
+                rotations[rotate_index].append(
+                    (
+                        direction,
+                        next_rotate_index,
+                        [offset_x * stride + offset_y for offset_x, offset_y in kicks],
+                    )
+                )
+    return rotations
+
+
+def fit_masks(rows: tuple[int, ...], piece_type: str) -> tuple[int, ...]:
+    # Positions are laid out column by column: bit x * stride + y stands for
+    # a rotate point at (y, x), so a drop is a carry and a step sideways is a
+    # shift by stride. fits[r] has the bit set when that rotate point with
+    # rotation r overlaps neither a wall nor a settled cell
+    stride = len(rows) + PAD
+    columns = _columns(len(rows))
+    free = _board_cells(len(rows))
+    for y, row in enumerate(rows):
+        if row:
+            free &= ~(columns[row] << y)
+    fits = []
+    for offsets in ROTATION_STATES[piece_type]:
+        fit = free
+        for dy, dx in offsets:
+            shift = dx * stride + dy
+            fit &= free >> shift if shift >= 0 else free << -shift
+        fits.append(fit)
+    return tuple(fits)
+
+
+def _trace(parents: list, stride: int, placement: Placement) -> tuple[tuple, tuple]:
+    y, x = placement.rotate_point
+    rotate_index = placement.rotate_index
+    position = x * stride + y
+    path = ["down"]
+    states = [(y, x, rotate_index)]
+    while True:
+        bit = 1 << position
+        for mask, action, parent_rotate_index, offset in parents[rotate_index]:
+            if mask & bit:
+                break
+        else:
+            break
+        position += offset
+        rotate_index = parent_rotate_index
+        x, y = divmod(position, stride)
+        path.append(action)
+        states.append((y, x, rotate_index))
+    return tuple(reversed(path)), tuple(reversed(states))
+
+
+@lru_cache(maxsize=PLACEMENT_CACHE_SIZE)
+def _search(
+    rows: tuple[int, ...], piece_type: str, start: tuple[int, int, int]
+) -> tuple[Placement, ...]:
+    # The search moves every reached position at once: reach[r] has a bit set
+    # for each rotate point reached with rotation r, and frontier[r] for those
+    # whose moves are still to be tried
+    stride = len(rows) + PAD
+    fits = fit_masks(rows, piece_type)
+    start_y, start_x, start_rotate_index = start
+    if not (0 <= start_y < len(rows) and 0 <= start_x < WIDTH):
+        return ()
+    start_bit = 1 << start_x * stride + start_y
+    if not fits[start_rotate_index] & start_bit:
+        return ()
+
+    rotations = _rotations(piece_type, stride)
+    reach = [0] * 4
+    frontier = [0] * 4
+    reach[start_rotate_index] = frontier[start_rotate_index] = start_bit
+    # parents[r] lists (mask, action, parent r, offset to the parent position)
+    parents = [[] for _ in range(4)]
+
+    # Each pass slides and turns before dropping, so paths shift and turn as
+    # high up as they can, before gravity can lock them
+    while any(frontier):
+        for rotate_index in range(4):
+            new = frontier[rotate_index]
+            if not new:
+                continue
+            frontier[rotate_index] = 0
+            fit = fits[rotate_index]
+
+            unreached = fit & ~reach[rotate_index]
+            spread = new
+            while spread:
+                left = (spread >> stride) & unreached
+                right = (spread << stride) & unreached & ~left
+                if left:
+                    parents[rotate_index].append((left, "left", rotate_index, stride))
+                if right:
+                    parents[rotate_index].append(
+                        (right, "right", rotate_index, -stride)
+                    )
+                spread = left | right
+                unreached &= ~spread
+                new |= spread
+            reach[rotate_index] |= new
+
+            for action, next_rotate_index, shifts in rotations[rotate_index]:
+                next_fit = fits[next_rotate_index]
+                remaining = new
+                for shift in shifts:
+                    if shift >= 0:
+                        turned = remaining & (next_fit >> shift)
+                        moved = turned << shift
+                    else:
+                        turned = remaining & (next_fit << -shift)
+                        moved = turned >> -shift
+                    if not turned:
+                        continue
+                    remaining &= ~turned
+                    moved &= ~reach[next_rotate_index]
+                    if moved:
+                        reach[next_rotate_index] |= moved
+                        frontier[next_rotate_index] |= moved
+                        parents[next_rotate_index].append(
+                            (moved, action, rotate_index, -shift)
+                        )
+                    if not remaining:
+                        break
+
+            # A carry runs from each position down its column until the piece
+            # stops fitting, which drops every column to its landing row at once
+            falls = ((fit + new) ^ fit ^ new) & fit & ~reach[rotate_index]
+            if falls:
+                parents[rotate_index].append((falls, "down", rotate_index, -1))
+                reach[rotate_index] |= falls
+                frontier[rotate_index] |= falls
+
+    placements = []
+    trace = partial(_trace, parents, stride)
+    locks = [reach[r] & ~(fits[r] >> 1) for r in range(4)]
+    for rotate_index, locked in enumerate(locks):
+        # Keep one rotation of those that lock on the same tiles
+        for earlier, offset_y, offset_x in DUPLICATES[piece_type][rotate_index]:
+            shift = offset_x * stride + offset_y
+            locked &= ~(
+                locks[earlier] >> shift if shift >= 0 else locks[earlier] << -shift
+            )
+        locks[rotate_index] = locked
+        while locked:
+            bit = locked & -locked
+            locked ^= bit
+            x, y = divmod(bit.bit_length() - 1, stride)
+            placements.append(Placement(piece_type, rotate_index, (y, x), trace))
+    return tuple(placements)
+
+
+def enumerate_placements(
+    board, piece_type: str, start: tuple[int, int, int] | None = None
+) -> tuple[Placement, ...]:
+    if start is None:
+        start = (*SPAWN_POINTS[piece_type], 0)
+    return _search(board_rows(board), piece_type, start)
+
+
+def game_placements(game) -> tuple[Placement, ...]:
+    tetromino = game.current_tetromino
+    return enumerate_placements(
+        game.settled,
+        tetromino.piece_type,
+        (*tetromino.rotate_point, tetromino.rotate_index),
+    )
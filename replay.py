@@ -0,0 +1,180 @@
+import copy
+import struct
+from bisect import bisect_left
+from itertools import accumulate
+from tetris import ACTIONS, GARBAGE_EVENT, Tetris
+
+MAGIC = b"PTRP"
+# Version 2 appends the hole columns of every garbage event
+VERSION = 2
+HEADER = struct.Struct("<4sBQHI")
+SNAPSHOT_INTERVAL = 256
+
+# Each event is one byte: the action code in the low 3 bits and the frame
+# delta in the high 5 bits, with larger deltas spilling into a varint
+ACTION_BITS = 3
+INLINE_DELTA = (1 << (8 - ACTION_BITS)) - 1
+
+
+def write_varint(data: bytearray, value: int) -> None:
+    while value >= 0x80:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value += (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return value, offset
+
+
+class Replay:
+    def __init__(
+        self,
+        seed: int,
+        level: int = 1,
+        events: list | None = None,
+        garbage: list | None = None,
+    ) -> None:
+        self.seed = seed
+        self.level = level
+        self.events = events if events is not None else []
+        self.garbage = garbage if garbage is not None else []
+
+    @classmethod
+    def from_game(cls, game: Tetris) -> "Replay":
+        if game.events is None:
+            raise ValueError("game was not created with record=True")
+        return cls(game.seed, game.start_level, list(game.events), list(game.garbage))
+
+    def to_bytes(self) -> bytes:
+        data = bytearray(
+            HEADER.pack(MAGIC, VERSION, self.seed, self.level, len(self.events))
+        )
+        last_frame = 0
+        for frame, action in self.events:
+            delta = frame - last_frame
+            last_frame = frame
+            data.append(action | min(delta, INLINE_DELTA) << ACTION_BITS)
+            if delta >= INLINE_DELTA:
+                write_varint(data, delta - INLINE_DELTA)
+
+        for holes in self.garbage:
+            write_varint(data, len(holes))
+            data.extend(holes)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        magic, version, seed, level, event_count = HEADER.unpack_from(data)
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("not a PyTetris replay")
+
+        events = []
+        frame = 0
+        offset = HEADER.size
+        for _ in range(event_count):
+            byte = data[offset]
+            offset += 1
+            delta = byte >> ACTION_BITS
+            if delta == INLINE_DELTA:
+                spill, offset = read_varint(data, offset)
+                delta += spill
+            frame += delta
+            events.append((frame, byte & ((1 << ACTION_BITS) - 1)))
+
+        garbage = []
+        if version >= 2:
+            for _ in range(sum(action == GARBAGE_EVENT for _, action in events)):
+                count, offset = read_varint(data, offset)
+                garbage.append(tuple(data[offset : offset + count]))
+                offset += count
+        return cls(seed, level, events, garbage)
+
+    def save(self, file_path: str) -> None:
+        with open(file_path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, file_path: str) -> "Replay":
+        with open(file_path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+class ReplayPlayer:
+    def __init__(
+        self, replay: Replay, snapshot_interval: int = SNAPSHOT_INTERVAL
+    ) -> None:
+        self._replay = replay
+        self._snapshot_interval = snapshot_interval
+        self._snapshot_frames = []
+        self._snapshots = []
+        self._final_game = None
+        # Garbage events seen before each event index, to resume from snapshots
+        self._garbage_before = list(
+            accumulate(
+                (action == GARBAGE_EVENT for _, action in replay.events), initial=0
+            )
+        )
+
+    def _new_game(self) -> Tetris:
+        return Tetris(seed=self._replay.seed, level=self._replay.level)
+
+    def _apply(
+        self, game: Tetris, start: int, stop: int, until_frame: int | None = None
+    ) -> None:
+        garbage_index = self._garbage_before[start]
+        for frame, action in self._replay.events[start:stop]:
+            if until_frame is not None and frame >= until_frame:
+                break
+            while game.frame < frame:
+                game.tick(0)
+            if action == GARBAGE_EVENT:
+                game.add_garbage(list(self._replay.garbage[garbage_index]))
+                garbage_index += 1
+            else:
+                game.step(ACTIONS[action])
+
+        if until_frame is not None:
+            while game.frame < until_frame:
+                game.tick(0)
+
+    def run(self) -> Tetris:
+        if self._final_game is not None:
+            return self._final_game
+
+        game = self._new_game()
+        for index in range(0, len(self._replay.events), self._snapshot_interval):
+            self._snapshot_frames.append(game.frame)
+            self._snapshots.append((index, copy.deepcopy(game)))
+            self._apply(game, index, index + self._snapshot_interval)
+
+        self._final_game = game
+        return game
+
+    def seek(self, frame: int) -> Tetris:
+        final_game = self.run()
+        # Frames stop advancing once the game is over
+        if frame > final_game.frame:
+            return copy.deepcopy(final_game)
+        # Only snapshots taken before any event of the target frame are usable
+        position = bisect_left(self._snapshot_frames, frame) - 1
+        if position < 0:
+            game = self._new_game()
+            start = 0
+        else:
+            start, snapshot = self._snapshots[position]
+            game = copy.deepcopy(snapshot)
+        self._apply(game, start, len(self._replay.events), frame)
+        return game
+
+    @property
+    def replay(self) -> Replay:
+        return self._replay
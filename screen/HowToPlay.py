@@ -62,9 +62,12 @@ class HowToPlayScreen(Screen):
             orientation="vertical",
             size_hint=(None, None),
             width=SCREEN_RESOLUTION[0] * 0.6,
-            height=SCREEN_RESOLUTION[1] * 0.5,
             spacing=SCREEN_RESOLUTION[1] * 0.025,
         )
+        # Grows with the list of controls instead of a fixed share of the screen
+        instructions_container.bind(
+            minimum_height=instructions_container.setter("height")
+        )
 
         title_label = Label(
             text="Tetris Controls",
@@ -83,10 +86,12 @@ class HowToPlayScreen(Screen):
 
         instructions = [
             "W - Soft Drop",
+            "Space - Hard Drop",
             "A - Move Left",
             "D - Move Right",
             "Arrow Right - Rotate Clockwise",
             "Arrow Left - Rotate Counterclockwise",
+            "P - Toggle AI Player",
         ]
 
         for text in instructions:
@@ -0,0 +1,112 @@
+import numpy as np
+from kivy.graphics import Mesh, RenderContext
+
+VERTEX_FORMAT = [(b"vPosition", 2, "float"), (b"vColor", 4, "float")]
+GRID_LINE_COLOR = (1, 1, 1, 0.4)
+GRID_LINE_WIDTH = 1
+
+VERTEX_SHADER = """
+#ifdef GL_ES
+    precision highp float;
+#endif
+
+attribute vec2 vPosition;
+attribute vec4 vColor;
+
+uniform mat4 modelview_mat;
+uniform mat4 projection_mat;
+
+varying vec4 frag_color;
+
+void main() {
+    frag_color = vColor;
+    gl_Position = projection_mat * modelview_mat * vec4(vPosition, 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#ifdef GL_ES
+    precision highp float;
+#endif
+
+varying vec4 frag_color;
+
+void main() {
+    gl_FragColor = frag_color;
+}
+"""
+
+
+class BoardMesh:
+    def __init__(
+        self, pos: tuple, cols: int, rows: int, cell_size: float, colors: dict
+    ) -> None:
+        self._cols = cols
+        self._rows = rows
+
+        # Index 0 (empty) stays fully transparent
+        self._palette = np.zeros((max(colors) + 1, 4), dtype=np.float32)
+        for value, color in colors.items():
+            self._palette[value] = (*color, 1)
+
+        # Grid line quads come first so the cells are drawn over them
+        x, y = pos
+        half_width = GRID_LINE_WIDTH / 2
+        quads = []
+        for row in range(rows + 1):
+            line_y = y + row * cell_size
+            quads.append(
+                (x, line_y - half_width, x + cols * cell_size, line_y + half_width)
+            )
+        for col in range(cols + 1):
+            line_x = x + col * cell_size
+            quads.append(
+                (line_x - half_width, y, line_x + half_width, y + rows * cell_size)
+            )
+        self._line_count = len(quads)
+        for row in range(rows):
+            for col in range(cols):
+                cell_x = x + col * cell_size
+                cell_y = y + row * cell_size
+                quads.append((cell_x, cell_y, cell_x + cell_size, cell_y + cell_size))
+
+        quads = np.array(quads, dtype=np.float32)
+        self._vertices = np.zeros((len(quads), 4, 6), dtype=np.float32)
+        self._vertices[:, :, 0] = quads[:, [0, 2, 2, 0]]
+        self._vertices[:, :, 1] = quads[:, [1, 1, 3, 3]]
+        self._vertices[: self._line_count, :, 2:] = GRID_LINE_COLOR
+
+        corners = np.arange(len(quads))[:, None] * 4
+        indices = (corners + [0, 1, 2, 2, 3, 0]).ravel().tolist()
+
+        self.context = RenderContext(
+            use_parent_projection=True, use_parent_modelview=True
+        )
+        self.context.shader.vs = VERTEX_SHADER
+        self.context.shader.fs = FRAGMENT_SHADER
+        self._mesh = Mesh(
+            vertices=self._vertices.ravel().tolist(),
+            indices=indices,
+            fmt=VERTEX_FORMAT,
+            mode="triangles",
+        )
+        self.context.add(self._mesh)
+
+    def update(
+        self, board: np.ndarray, changed_cells: np.ndarray | None = None
+    ) -> None:
+        # Board is bottom row first, as in Tetris.board and GameSnapshot.board
+        if changed_cells is None:
+            rows, cols = np.indices((self._rows, self._cols)).reshape(2, -1)
+        else:
+            if not len(changed_cells):
+                return
+            rows, cols = changed_cells.T
+
+        cells = self._line_count + rows * self._cols + cols
+        self._vertices[cells, :, 2:] = self._palette[board[rows, cols]][:, None]
+        self._mesh.vertices = self._vertices.ravel().tolist()
+
+    def clear(self) -> None:
+        self._vertices[self._line_count :, :, 2:] = 0
+        self._mesh.vertices = self._vertices.ravel().tolist()
@@ -0,0 +1,634 @@
+from kivy.app import App
+from kivy.uix.widget import Widget
+from kivy.graphics import Rectangle, Color, Line, InstructionGroup
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.floatlayout import FloatLayout
+from kivy.uix.label import Label
+from kivy.uix.button import Button
+from kivy.core.text import LabelBase
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.properties import NumericProperty, StringProperty, BooleanProperty
+from kivy.uix.modalview import ModalView
+from ai import TetrisAI
+from modes import GameMode
+from tetris import GHOST
+from screen.boardMesh import BoardMesh
+
+LabelBase.register(name="Jersey10", fn_regular="./font/Jersey10-Regular.ttf")
+
+SCREEN_RESOLUTION = (2880, 1800)
+WINDOW_BG_COLOR = (0.1, 0.1, 0.1, 1)
+GRID_COLS, GRID_ROWS = 10, 20
+CELL_SIZE = 70
+REFRESH_RATE = 1 / 30
+# The mesh renderer is cheap enough to redraw on every frame
+MESH_RENDERER = False
+MESH_REFRESH_RATE = 0
+AI_MOVE_INTERVAL = 0.05
+# Delayed auto shift and auto repeat rate for held sideways keys, in seconds
+DAS_DELAY = 0.167
+ARR_INTERVAL = 0.033
+SOFT_DROP_INTERVAL = 0.05
+
+KEY_ACTIONS = {
+    "a": "left",
+    "d": "right",
+    "w": "down",
+    "right": "CW",
+    "left": "CCW",
+    "spacebar": "drop",
+}
+SHIFT_KEYS = {"a": "d", "d": "a"}
+
+TETROMINO_COLORS = {
+    1: [0.7, 0.3, 0.2],
+    2: [0.5, 0.7, 0.2],
+    3: [0.7, 0.2, 0.2],
+    4: [0.6, 0.2, 0.6],
+    5: [0.4, 0.8, 0.6],
+    6: [0.7, 0.6, 0.2],
+    7: [0.2, 0.7, 0.5],
+    8: [0.4, 0.4, 0.4],
+    9: [0, 0, 0],
+}
+# Ghost pieces are drawn as dimmed versions of their piece color
+TETROMINO_COLORS.update(
+    {
+        GHOST + value: [c * 0.35 for c in TETROMINO_COLORS[value]]
+        for value in range(1, 8)
+    }
+)
+
+TETROMINO_SHAPES = {
+    "L": [[0, 0, 1, 0], [1, 1, 1, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
+    "S": [[0, 1, 1, 0], [1, 1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
+    "Z": [[1, 1, 0, 0], [0, 1, 1, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
+    "T": [[0, 1, 0, 0], [1, 1, 1, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
+    "J": [[1, 0, 0, 0], [1, 1, 1, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
+    "O": [[0, 1, 1, 0], [0, 1, 1, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
+    "I": [[1, 1, 1, 1], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
+}
+
+Window.clearcolor = WINDOW_BG_COLOR
+
+
+class TetrisBoard(Widget):
+    lines_cleared = NumericProperty(0)
+    level = NumericProperty(0)
+    score = NumericProperty(0)
+    next_tetromino = StringProperty("")
+    game_over = BooleanProperty(False)
+    game_win = BooleanProperty(False)
+
+    def __init__(
+        self,
+        init_pos,
+        mode: GameMode,
+        mesh: bool = MESH_RENDERER,
+        das: float = DAS_DELAY,
+        arr: float = ARR_INTERVAL,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.mode = mode
+        self.das = das
+        self.arr = arr
+        self.grid = [[0] * GRID_COLS for _ in range(GRID_ROWS)]
+        self.size_hint = (None, None)
+        self.size = (GRID_COLS * CELL_SIZE, GRID_ROWS * CELL_SIZE)
+        self.pos = init_pos
+
+        self._draw_grid_borders()
+        if mesh:
+            self.board_mesh = BoardMesh(
+                init_pos, GRID_COLS, GRID_ROWS, CELL_SIZE, TETROMINO_COLORS
+            )
+            self.canvas.add(self.board_mesh.context)
+        else:
+            self.board_mesh = None
+            self.grid_lines = InstructionGroup()
+            self.canvas.add(self.grid_lines)
+            self._draw_grid_lines(init_pos)
+            self.cells = InstructionGroup()
+            self.canvas.add(self.cells)
+            self._create_cells(init_pos)
+
+        self.game = self.mode.new_game(GRID_COLS, GRID_ROWS)
+        self.total_clear_line = self.game.total_clear_line
+        self.level = self.game.level
+        self.score = self.game.score
+        self.next_tetromino = self.game.bag.next_piece
+        self.game_over = self.game.is_game_over
+        self.drawn_snapshot = None
+        self.elapsed_time = 0
+
+        self._keyboard = Window.request_keyboard(self._on_keyboard_closed, self)
+        self._keyboard.bind(on_key_down=self._on_key_down)
+        self._keyboard.bind(on_key_up=self._on_key_up)
+        self.pressed_keys = set()
+        self.repeat_events = {}
+        self.ai_player = None
+
+        self.clock_events = [
+            Clock.schedule_interval(
+                self.update_board, MESH_REFRESH_RATE if mesh else REFRESH_RATE
+            ),
+            Clock.schedule_interval(self.ai_step, AI_MOVE_INTERVAL),
+            Clock.schedule_interval(self.gravity_step, 0),
+        ]
+
+    def _draw_grid_lines(self, init_pos: tuple = (0, 0)) -> None:
+        x, y = init_pos
+        self.grid_lines.clear()
+        self.grid_lines.add(Color(1, 1, 1, 0.4))
+        for row in range(GRID_ROWS + 1):
+            self.grid_lines.add(
+                Line(
+                    points=[
+                        x,
+                        y + row * CELL_SIZE,
+                        x + GRID_COLS * CELL_SIZE,
+                        y + row * CELL_SIZE,
+                    ],
+                    width=1,
+                )
+            )
+        for col in range(GRID_COLS + 1):
+            self.grid_lines.add(
+                Line(
+                    points=[
+                        x + col * CELL_SIZE,
+                        y,
+                        x + col * CELL_SIZE,
+                        y + GRID_ROWS * CELL_SIZE,
+                    ],
+                    width=1,
+                )
+            )
+
+    def _create_cells(self, init_pos: tuple = (0, 0)) -> None:
+        # One Color+Rectangle pair per cell, recolored in place and hidden
+        # with alpha 0 so the canvas never grows during a session
+        x, y = init_pos
+        self.cells.clear()
+        self.cell_colors = []
+        for row in range(GRID_ROWS):
+            row_colors = []
+            for col in range(GRID_COLS):
+                color = Color(0, 0, 0, 0)
+                self.cells.add(color)
+                self.cells.add(
+                    Rectangle(
+                        pos=(x + col * CELL_SIZE, y + row * CELL_SIZE),
+                        size=(CELL_SIZE, CELL_SIZE),
+                    )
+                )
+                row_colors.append(color)
+            self.cell_colors.append(row_colors)
+
+    def _draw_grid_borders(self) -> None:
+        # Left border
+        self.canvas.add(
+            Line(
+                points=[self.x, self.y, self.x, self.y + GRID_ROWS * CELL_SIZE], width=2
+            )
+        )
+
+        # Right border
+        self.canvas.add(
+            Line(
+                points=[
+                    self.x + GRID_COLS * CELL_SIZE,
+                    self.y,
+                    self.x + GRID_COLS * CELL_SIZE,
+                    self.y + GRID_ROWS * CELL_SIZE,
+                ],
+                width=2,
+            )
+        )
+
+        # Bottom border
+        self.canvas.add(
+            Line(
+                points=[self.x, self.y, self.x + GRID_COLS * CELL_SIZE, self.y], width=2
+            )
+        )
+
+    def update_board(self, *args) -> None:
+        snapshot = self.game.snapshot
+        # Only cells that changed since the last drawn snapshot are touched
+        changed_cells = snapshot.changed_cells(self.drawn_snapshot)
+        if self.board_mesh:
+            self.board_mesh.update(snapshot.board, changed_cells)
+        else:
+            for row, col in changed_cells.tolist():
+                board_value = snapshot.board[row, col]
+                if board_value != 0:
+                    self.cell_colors[row][col].rgba = (
+                        *TETROMINO_COLORS[board_value],
+                        1,
+                    )
+                else:
+                    self.cell_colors[row][col].a = 0
+        self.drawn_snapshot = snapshot
+
+        # The engine stamps line clears with perf_counter_ns, so a finished run
+        # reports the exact clear instead of when this frame happened to run
+        finish = self.mode.finish(snapshot)
+        self.elapsed_time = (finish[1] if finish else snapshot.elapsed_ns) / 1e9
+        self.checks(snapshot)
+
+    def checks(self, snapshot):
+        cleared_lines = snapshot.total_clear_line
+        level = snapshot.level
+        score = snapshot.score
+        next_tetromino = snapshot.next_piece
+        game_over = snapshot.is_game_over
+
+        if self.game_over != game_over:
+            self.game_over = game_over
+        if cleared_lines != self.lines_cleared:
+            self.lines_cleared = cleared_lines
+        if level != self.level:
+            self.level = level
+        if score != self.score:
+            self.score = score
+        if next_tetromino != self.next_tetromino:
+            self.next_tetromino = next_tetromino
+
+        if not self.game_over and not self.game_win and self.mode.is_won(snapshot):
+            self.game.submit("stop")
+            self.game_win = True
+
+    def stop(self) -> None:
+        # Nothing of a left game keeps running: gravity, the AI, redraws and
+        # held key repeats are all cancelled and the keyboard is handed back
+        for event in self.clock_events:
+            event.cancel()
+        for key in list(self.repeat_events):
+            self._cancel_repeat(key)
+        self.pressed_keys.clear()
+        if self._keyboard:
+            self._keyboard.release()
+
+    def _on_keyboard_closed(self) -> None:
+        self._keyboard.unbind(on_key_down=self._on_key_down)
+        self._keyboard.unbind(on_key_up=self._on_key_up)
+        self._keyboard = None
+
+    def _on_key_down(self, keyboard, keycode, text, modifiers) -> None:
+        key = keycode[1]
+        # Held keys repeat through DAS/ARR, not the OS key repeat
+        if key in self.pressed_keys:
+            return
+        self.pressed_keys.add(key)
+
+        if key == "q":
+            exit()
+        if key == "p":
+            self.ai_player = None if self.ai_player else TetrisAI()
+        if key not in KEY_ACTIONS:
+            return
+
+        # Applied right away so a tap never waits for the next scheduler tick
+        self.apply_action(KEY_ACTIONS[key])
+        if key == "w":
+            self._start_repeat(key, SOFT_DROP_INTERVAL)
+        elif key in SHIFT_KEYS:
+            self._cancel_repeat(SHIFT_KEYS[key])
+            self.repeat_events[key] = Clock.schedule_once(
+                lambda dt: self._auto_shift(key), self.das
+            )
+
+    def _on_key_up(self, keyboard, keycode) -> None:
+        self.pressed_keys.discard(keycode[1])
+        self._cancel_repeat(keycode[1])
+
+    def _start_repeat(self, key: str, interval: float) -> None:
+        self.repeat_events[key] = Clock.schedule_interval(
+            lambda dt: self.apply_action(KEY_ACTIONS[key]), interval
+        )
+
+    def _auto_shift(self, key: str) -> None:
+        # The first automatic shift lands when DAS runs out, then every ARR
+        action = KEY_ACTIONS[key]
+        if self.arr > 0:
+            self.apply_action(action)
+            self._start_repeat(key, self.arr)
+            return
+        # An ARR of 0 slides the piece to the wall, and keeps it there each frame
+        self._shift_to_wall(action)
+        self.repeat_events[key] = Clock.schedule_interval(
+            lambda dt: self._shift_to_wall(action), 0
+        )
+
+    def _shift_to_wall(self, action: str) -> None:
+        for _ in range(GRID_COLS):
+            rotate_point = self.game.current_tetromino.rotate_point
+            self.apply_action(action)
+            if self.game.current_tetromino.rotate_point == rotate_point:
+                break
+
+    def _cancel_repeat(self, key: str) -> None:
+        event = self.repeat_events.pop(key, None)
+        if event is not None:
+            event.cancel()
+
+    def apply_action(self, action: str) -> None:
+        self.game.submit(action)
+        self.game.process_commands()
+
+    def gravity_step(self, dt: float) -> None:
+        self.game.submit("tick", dt)
+        self.game.process_commands()
+
+    def ai_step(self, dt: float) -> None:
+        if self.ai_player and not (self.game_over or self.game_win):
+            action = self.ai_player(self.game)
+            if action:
+                self.apply_action(action)
+
+    def reset_game(self):
+        self.game = self.mode.new_game(GRID_COLS, GRID_ROWS)
+        self.total_clear_line = self.game.total_clear_line
+        self.level = self.game.level
+        self.score = self.game.score
+        self.next_tetromino = self.game.bag.next_piece
+        self.game_over = self.game.is_game_over
+        self.game_win = False
+        self.elapsed_time = 0
+        if self.board_mesh:
+            self.board_mesh.clear()
+        else:
+            for row_colors in self.cell_colors:
+                for color in row_colors:
+                    color.a = 0
+        self.drawn_snapshot = None
+
+
+class GameResultScreen(ModalView):
+    def __init__(
+        self, board, title, title_color, score, lines, level, time_taken, **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.board = board
+        self.size_hint = (0.5, 0.6)
+        self.auto_dismiss = False
+        self.background_color = (0.1, 0.1, 0.1, 0.9)
+
+        # Main layout
+        layout = BoxLayout(orientation="vertical", padding=20, spacing=20)
+
+        # Result title
+        result_label = Label(
+            text=title,
+            font_size=100,
+            font_name="Jersey10",
+            size_hint=(1, 0.2),
+            color=title_color,
+        )
+
+        # Stats layout
+        stats_layout = BoxLayout(orientation="vertical", spacing=20, size_hint=(1, 0.5))
+
+        score_label = Label(text=f"SCORE: {score}", font_size=72, font_name="Jersey10")
+        lines_label = Label(
+            text=f"LINES CLEARED: {lines}", font_size=72, font_name="Jersey10"
+        )
+        level_label = Label(text=f"LEVEL: {level}", font_size=72, font_name="Jersey10")
+
+        stats_layout.add_widget(score_label)
+        stats_layout.add_widget(lines_label)
+        stats_layout.add_widget(level_label)
+        if time_taken is not None:
+            time_label = Label(
+                text=f"TIME: {time_taken:.3f} seconds",
+                font_size=72,
+                font_name="Jersey10",
+            )
+            stats_layout.add_widget(time_label)
+
+        # Buttons layout
+        buttons_layout = BoxLayout(
+            orientation="horizontal", spacing=30, size_hint=(1, 0.3), padding=(50, 10)
+        )
+
+        restart_button = Button(
+            text="RESTART",
+            font_size=64,
+            font_name="Jersey10",
+            background_color=(0.1, 0.7, 0.3, 1),
+            size_hint=(0.5, 1),
+        )
+        restart_button.bind(on_release=self.restart_game)
+
+        exit_button = Button(
+            text="EXIT",
+            font_size=64,
+            font_name="Jersey10",
+            background_color=(1, 0.3, 0.3, 1),
+            size_hint=(0.5, 1),
+        )
+        exit_button.bind(on_release=self.exit_game)
+
+        buttons_layout.add_widget(restart_button)
+        buttons_layout.add_widget(exit_button)
+
+        # Add all elements to the main layout
+        layout.add_widget(result_label)
+        layout.add_widget(stats_layout)
+        layout.add_widget(buttons_layout)
+
+        self.add_widget(layout)
+
+    def restart_game(self, instance):
+        self.board.reset_game()
+        self.dismiss()
+
+    def exit_game(self, instance):
+        exit()
+
+
+class GameOverScreen(GameResultScreen):
+    def __init__(self, board, score, lines, level, time_taken, **kwargs):
+        super().__init__(
+            board=board,
+            title="GAME OVER",
+            title_color=(1, 0.3, 0.3, 1),  # Red color
+            score=score,
+            lines=lines,
+            level=level,
+            time_taken=time_taken,
+            **kwargs,
+        )
+
+
+class WinScreen(GameResultScreen):
+    def __init__(self, board, score, lines, level, time_taken, **kwargs):
+        super().__init__(
+            board=board,
+            title="YOU WIN",
+            title_color=(0.1, 0.8, 0.1, 1),  # Green color
+            score=score,
+            lines=lines,
+            level=level,
+            time_taken=time_taken,
+            **kwargs,
+        )
+
+
+class NextTetrominoWidget(Widget):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.size_hint = (None, None)
+        self.size = (4 * CELL_SIZE // 1.2, 4 * CELL_SIZE // 1.2)
+        self.canvas.clear()
+        self.blocks = []
+
+    def update_tetromino(self, tetromino: str) -> None:
+        piece_shape = TETROMINO_SHAPES[tetromino]
+        self.canvas.clear()
+        self.blocks.clear()
+
+        match tetromino:
+            case "L":
+                color = TETROMINO_COLORS[1]
+            case "S":
+                color = TETROMINO_COLORS[2]
+            case "Z":
+                color = TETROMINO_COLORS[3]
+            case "T":
+                color = TETROMINO_COLORS[4]
+            case "J":
+                color = TETROMINO_COLORS[5]
+            case "O":
+                color = TETROMINO_COLORS[6]
+            case "I":
+                color = TETROMINO_COLORS[7]
+
+        with self.canvas:
+            Color(*color, 1)
+            for row in range(4):
+                for col in range(4):
+                    if piece_shape[row][col]:
+                        rect = Rectangle(
+                            pos=(
+                                (self.x - CELL_SIZE // 2) + col * (CELL_SIZE // 1.2),
+                                (self.y + CELL_SIZE // 2)
+                                + (3 - row) * (CELL_SIZE // 1.2),
+                            ),
+                            size=(CELL_SIZE // 1.2, CELL_SIZE // 1.2),
+                        )
+                        self.blocks.append(rect)
+                        self.canvas.add(rect)
+
+
+class GameApp(App):
+    mode_class = GameMode
+
+    def create_label_pair(self, text: str, value: str) -> tuple[BoxLayout, Label]:
+        container = BoxLayout(
+            orientation="vertical", size_hint=(None, None), spacing=64
+        )
+        label = Label(
+            text=text,
+            font_size=72,
+            font_name="Jersey10",
+        )
+        value_label = Label(
+            text=value,
+            font_size=64,
+            font_name="Jersey10",
+        )
+        container.add_widget(label)
+        container.add_widget(value_label)
+        return container, value_label
+
+    def build(self) -> TetrisBoard:
+        Window.fullscreen = "auto"
+        init_pos = (
+            (((SCREEN_RESOLUTION[0] - (GRID_COLS * CELL_SIZE)) / 2) - 120),
+            (((SCREEN_RESOLUTION[1] - (GRID_ROWS * CELL_SIZE)) / 2)),
+        )
+
+        self.tetris_board = TetrisBoard(init_pos, self.mode_class())
+        self.next_tetromino_widget = NextTetrominoWidget()
+
+        self.info_panel = BoxLayout(
+            orientation="vertical",
+            spacing=120,
+            size_hint=(None, None),
+            size=(400, 300),
+            pos=(
+                self.tetris_board.width + init_pos[0] + 120,
+                init_pos[1] + 100,
+            ),
+        )
+
+        self.lines_container, self.lines_value = self.create_label_pair("LINES", "0")
+        self.level_container, self.level_value = self.create_label_pair("LEVEL", "1")
+        self.score_container, self.score_value = self.create_label_pair("SCORE", "0")
+
+        next_tetromino_label_container = BoxLayout(
+            orientation="vertical", size_hint=(None, None), spacing=64
+        )
+        next_tetromino_label = Label(
+            text="NEXT",
+            font_size=72,
+            font_name="Jersey10",
+        )
+        next_tetromino_label_container.add_widget(next_tetromino_label)
+        self.info_panel.add_widget(next_tetromino_label_container)
+        self.info_panel.add_widget(self.next_tetromino_widget)
+        self.info_panel.add_widget(self.lines_container)
+        self.info_panel.add_widget(self.level_container)
+        self.info_panel.add_widget(self.score_container)
+
+        self.tetris_board.bind(lines_cleared=self.update_lines)
+        self.tetris_board.bind(level=self.update_levels)
+        self.tetris_board.bind(score=self.update_scores)
+        self.tetris_board.bind(next_tetromino=self.update_next_tetromino)
+        self.tetris_board.bind(game_over=self.show_game_over)
+        self.tetris_board.bind(game_win=self.show_game_win)
+
+        root = FloatLayout()
+        root.add_widget(self.tetris_board)
+        root.add_widget(self.info_panel)
+
+        Clock.schedule_once(
+            lambda dt: self.next_tetromino_widget.update_tetromino(
+                self.tetris_board.game.bag.next_piece
+            )
+        )
+        return root
+
+    def update_lines(self, instance, value):
+        self.lines_value.text = str(value)
+
+    def update_levels(self, instance, value):
+        self.level_value.text = str(value)
+
+    def update_scores(self, instance, value):
+        self.score_value.text = str(value)
+
+    def update_next_tetromino(self, instance, value):
+        self.next_tetromino_widget.update_tetromino(value)
+
+    def show_game_over(self, instance, value):
+        if value:
+            self.show_result(GameOverScreen, instance)
+
+    def show_game_win(self, instance, value):
+        if value:
+            self.show_result(WinScreen, instance)
+
+    def show_result(self, screen_class, board: TetrisBoard) -> None:
+        time_taken = board.elapsed_time if board.mode.timed else None
+        screen_class(
+            board=board,
+            score=board.score,
+            lines=board.lines_cleared,
+            level=board.level,
+            time_taken=time_taken,
+        ).open()
@@ -0,0 +1,10 @@
+from modes import DigMode
+from screen.gameCore import GameApp
+
+
+class TetrisDigApp(GameApp):
+    mode_class = DigMode
+
+
+if __name__ == "__main__":
+    TetrisDigApp().run()
@@ -0,0 +1,10 @@
+from modes import UltraMode
+from screen.gameCore import GameApp
+
+
+class TetrisUltraApp(GameApp):
+    mode_class = UltraMode
+
+
+if __name__ == "__main__":
+    TetrisUltraApp().run()
@@ -1,15 +1,20 @@
 import numpy as np
 import os
 import time
-import keyboard
-import threading
+import queue
 import random
+from board import ArrayBoard, BitBoard
 
 WIDTH = 10
 HEIGHT = 20
 DROP_INIT_INTERVAL = 1
 CLEARLINE_NUM = 9
+GARBAGE = 8
+GHOST = 10
 ROTATION_MATRIX = {"CW": [[0, 1], [-1, 0]], "CCW": [[0, -1], [1, 0]]}
+ACTIONS = ("left", "right", "down", "CW", "CCW", "drop")
+# Recorded in the event stream alongside ACTIONS codes, holes kept separately
+GARBAGE_EVENT = len(ACTIONS)
 
 PIECES = {
     "L": [(0, 0), (-1, 0), (1, 0), (1, 1)],
@@ -22,6 +27,7 @@ PIECES = {
 }
 
 PIECES_INDEX = {piece: index for index, piece in enumerate(PIECES.keys(), start=1)}
+INDEX_PIECES = {index: piece for piece, index in PIECES_INDEX.items()}
 
 OFFSET_JLSTZ = {
     "0>1": [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
@@ -47,41 +53,72 @@ OFFSET_I = {
 
 
 class Bag:
-    def __init__(self) -> None:
-        self._available_pieces = list(PIECES.keys())
+    def __init__(self, seed: int | random.Random | None = None) -> None:
+        if isinstance(seed, random.Random):
+            self._random = seed
+        else:
+            self._random = random.Random(seed)
+        self._available_pieces = list(PIECES_INDEX.values())
         self._total_pieces = len(self._available_pieces)
-        self._current_index = 0
-        self._shuffled_pieces = []
-        self._shuffle_pieces()
+        # One stream of dealt piece indices; _offset is the absolute position
+        # of _sequence[0], _dealt and _generated are absolute positions too.
+        # A cursor stays None until it is first used, so it holds nothing back,
+        # and then starts at the oldest bag still kept
+        self._sequence = np.empty(0, dtype=np.uint8)
+        self._offset = 0
+        self._dealt = None
+        self._generated = None
         self._next_piece = None
 
-    def _shuffle_pieces(self) -> None:
-        self._current_index = 0
-        self._shuffled_pieces = []
-
-        for _ in range(self._total_pieces):
-            choose_piece = random.choice(self._available_pieces)
-            self._available_pieces.remove(choose_piece)
-            self._shuffled_pieces.append(choose_piece)
-
-        self._available_pieces = list(PIECES.keys())
+    def _fill(self, end: int) -> None:
+        missing = end - self._offset - len(self._sequence)
+        if missing <= 0:
+            return
+        bags = []
+        for _ in range(-(-missing // self._total_pieces)):
+            bag = list(self._available_pieces)
+            self._random.shuffle(bag)
+            bags.append(bag)
+
+        # Drop whole bags every cursor in use has moved past
+        passed = min(
+            cursor for cursor in (self._dealt, self._generated) if cursor is not None
+        )
+        consumed = (passed - self._offset) // self._total_pieces * self._total_pieces
+        self._sequence = np.concatenate(
+            (self._sequence[consumed:], np.array(bags, dtype=np.uint8).ravel())
+        )
+        self._offset += consumed
+
+    def generate_sequence(self, bag_count: int) -> np:
+        # The next bags of the same stream choose() deals from, so it never
+        # changes which pieces choose() deals later
+        if self._generated is None:
+            self._generated = self._offset
+        start = self._generated
+        end = start + bag_count * self._total_pieces
+        self._fill(end)
+        self._generated = end
+        return self._sequence[start - self._offset : end - self._offset].copy()
 
     def choose(self) -> str:
-        choose_piece = self._shuffled_pieces[self._current_index]
-        self._current_index += 1
-
-        if self._current_index < self._total_pieces:
-            self._next_piece = self._shuffled_pieces[self._current_index]
-        else:
-            self._shuffle_pieces()
-            self._next_piece = self._shuffled_pieces[0]
-
+        if self._dealt is None:
+            self._dealt = self._offset
+        self._fill(self._dealt + 2)
+        position = self._dealt - self._offset
+        choose_piece = INDEX_PIECES[int(self._sequence[position])]
+        self._next_piece = INDEX_PIECES[int(self._sequence[position + 1])]
+        self._dealt += 1
         return choose_piece
 
     @property
     def next_piece(self) -> str:
         return self._next_piece
 
+    @property
+    def current_index(self) -> int:
+        return (self._dealt or 0) % self._total_pieces
+
 
 class Tetromino:
     def __init__(self, piece_type: str) -> None:
@@ -109,13 +146,9 @@ class Tetromino:
     def rotate_offset(
         self, board: np, direction: str, new_tiles_pos: list
     ) -> tuple[int, int] | bool:
-        rotation_step = 1 if direction == "CW" else -1
-        next_rotate_index = (self._rotate_index + rotation_step) % 4
-
-        if self._piece_type == "I":
-            offset_data = OFFSET_I[f"{self._rotate_index}>{next_rotate_index}"]
-        else:
-            offset_data = OFFSET_JLSTZ[f"{self._rotate_index}>{next_rotate_index}"]
+        next_rotate_index, _, offset_data = ROTATION_TABLE[
+            self._piece_type, self._rotate_index, direction
+        ]
 
         for offset_x, offset_y in offset_data:
             if all(
@@ -133,20 +166,11 @@ class Tetromino:
         if self._piece_type == "O":
             return
 
-        new_tiles_pos = []
-
-        for tile_y, tile_x in self.tiles_pos:
-            tile_coordinate_x = tile_x - self.rotate_point[1]
-            tile_coordinate_y = tile_y - self.rotate_point[0]
-            tile_coordinate_rotated = np.dot(
-                ROTATION_MATRIX[direction], [tile_coordinate_x, tile_coordinate_y]
-            )
-
-            tile_position_rotated = (
-                self.rotate_point[0] - int(tile_coordinate_rotated[1]),
-                self.rotate_point[1] - int(tile_coordinate_rotated[0]),
-            )
-            new_tiles_pos.append(tile_position_rotated)
+        _, rotated_offsets, _ = ROTATION_TABLE[
+            self._piece_type, self._rotate_index, direction
+        ]
+        rotate_y, rotate_x = self.rotate_point
+        new_tiles_pos = [(rotate_y + dy, rotate_x + dx) for dy, dx in rotated_offsets]
 
         offset = self.rotate_offset(board, direction, new_tiles_pos)
         if offset:
@@ -167,24 +191,123 @@ class Tetromino:
     def grid(self) -> np:
         return self._grid
 
+    @property
+    def rotate_index(self) -> int:
+        return self._rotate_index
+
+
+def build_rotation_table() -> dict:
+    rotation_table = {}
+    for piece_type in PIECES:
+        grid = Tetromino(piece_type).grid
+        spawn_offsets = [(int(i) - 1, int(j) - 1) for i, j in np.argwhere(grid == 1)]
+
+        # Rotate the spawn offsets around the rotate point with ROTATION_MATRIX
+        (a, b), (c, d) = ROTATION_MATRIX["CW"]
+        states = [spawn_offsets]
+        for _ in range(3):
+            states.append(
+                [(-(c * dx + d * dy), -(a * dx + b * dy)) for dy, dx in states[-1]]
+            )
+
+        offset_table = OFFSET_I if piece_type == "I" else OFFSET_JLSTZ
+        for rotate_index in range(4):
+            for direction, rotation_step in (("CW", 1), ("CCW", -1)):
+                next_rotate_index = (rotate_index + rotation_step) % 4
+                rotation_table[piece_type, rotate_index, direction] = (
+                    next_rotate_index,
+                    tuple(states[next_rotate_index]),
+                    tuple(offset_table[f"{rotate_index}>{next_rotate_index}"]),
+                )
+    return rotation_table
+
+
+ROTATION_TABLE = build_rotation_table()
+ROTATION_STATES = {
+    piece_type: tuple(
+        ROTATION_TABLE[piece_type, (rotate_index - 1) % 4, "CW"][1]
+        for rotate_index in range(4)
+    )
+    for piece_type in PIECES
+}
+SPAWN_POINTS = {piece_type: (1, 4) for piece_type in PIECES} | {"I": (0, 4)}
+
+
+class GameSnapshot:
+    def __init__(self, game: "Tetris") -> None:
+        self.board = game.board.copy()
+        # Ghost cells are GHOST + piece index, drawn only where the board is empty
+        if not game.is_game_over:
+            height = self.board.shape[0]
+            ghost_value = GHOST + PIECES_INDEX[game.current_tetromino.piece_type]
+            for y, x in game.ghost_positions:
+                if self.board[height - 1 - y, x] == 0:
+                    self.board[height - 1 - y, x] = ghost_value
+        self.board.flags.writeable = False
+        self.score = game.score
+        self.total_clear_line = game.total_clear_line
+        self.level = game.level
+        self.next_piece = game.bag.next_piece
+        self.is_game_over = game.is_game_over
+        self.frame = game.frame
+        self.play_time = game.play_time
+        self.elapsed_ns = game.elapsed_ns
+        self.last_clear = game.last_clear
+
+    def changed_cells(self, previous: "GameSnapshot | None" = None) -> np.ndarray:
+        # (row, col) pairs that differ from a previously drawn snapshot
+        if previous is None:
+            return np.argwhere(self.board != 0)
+        if previous is self:
+            return np.empty((0, 2), dtype=np.intp)
+        return np.argwhere(self.board != previous.board)
+
 
 class Tetris:
-    def __init__(self, width=WIDTH, height=HEIGHT, level: int = 1) -> None:
+    def __init__(
+        self,
+        width=WIDTH,
+        height=HEIGHT,
+        level: int = 1,
+        bitboard: bool = False,
+        clock=time.monotonic,
+        timer=time.perf_counter_ns,
+        seed: int | random.Random | None = None,
+        record: bool = False,
+    ) -> None:
+        if record and not isinstance(seed, int):
+            seed = (seed or random).getrandbits(32)
         self._board = np.zeros((height, width), dtype=int)
         self._width = width
         self._height = height
-        self._tetrominos = []
-        self._bag = Bag()
+        self._settled = (
+            BitBoard(width, height) if bitboard else ArrayBoard(width, height)
+        )
+        self._seed = seed
+        self._frame = 0
+        self._timer = timer
+        self._start_ns = timer()
+        self._end_ns = None
+        self._last_clear = None
+        self._events = [] if record else None
+        self._garbage = [] if record else None
+        self._bag = Bag(seed)
         self._current_tetromino = Tetromino(self._bag.choose())
         self._running = True
         self.is_game_over = False
         self.spawn_tetromino(self._current_tetromino)
         self._total_clear_line = 0
         self._level = level
+        self._start_level = level
         self._level_progression = 0
         self._score = 0
         self._drop_interval = self.cal_drop_interval(level)
-        threading.Timer(self._drop_interval, self.start_drop_thread).start()
+        self._clock = clock
+        self._last_tick = clock()
+        self._gravity_elapsed = 0.0
+        self._play_time = 0.0
+        self._commands = queue.SimpleQueue()
+        self._snapshot = GameSnapshot(self)
 
     def cal_drop_interval(self, level: int) -> float:
         caled_drop_interval = 1
@@ -215,19 +338,71 @@ class Tetris:
             score = level * 1200
         return score
 
-    def start_drop_thread(self) -> None:
-        self.drop_thread = threading.Thread(
-            target=self.drop_tetromino, daemon=True
-        ).start()
-
-    def drop_tetromino(self):
-        while self._running:
-            if not self._current_tetromino.is_set:
-                self.move_tetromino("down")
-            time.sleep(self._drop_interval)
-
     def stop(self):
         self._running = False
+        if self._end_ns is None:
+            self._end_ns = self._timer()
+
+    def step(self, action: str) -> None:
+        # Moves after a win or top-out would keep placing pieces on a finished game
+        if not self._running:
+            return
+        if action == "drop":
+            self.hard_drop()
+        elif action in ("CW", "CCW"):
+            self.rotate_tetromino(action)
+        else:
+            self.move_tetromino(action)
+
+    def tick(self, dt: float | None = None) -> None:
+        if dt is None:
+            now = self._clock()
+            dt = now - self._last_tick
+            self._last_tick = now
+        if not self._running:
+            return
+
+        self._play_time += dt
+
+        # Carry the remainder over so drops never drift from the real interval
+        self._gravity_elapsed += dt
+        while self._gravity_elapsed >= self._drop_interval and not self.is_game_over:
+            self._gravity_elapsed -= self._drop_interval
+            self.move_tetromino("down")
+        self._frame += 1
+
+    def __getstate__(self) -> dict:
+        # Pending commands belong to the live game, copies start with none
+        state = self.__dict__.copy()
+        del state["_commands"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._commands = queue.SimpleQueue()
+
+    def submit(self, action: str, *args) -> None:
+        self._commands.put((action, args))
+
+    def process_commands(self, limit: int | None = None) -> int:
+        # Only the owner of the game calls this; other threads just submit()
+        processed = 0
+        while limit is None or processed < limit:
+            try:
+                action, args = self._commands.get_nowait()
+            except queue.Empty:
+                break
+            if action == "tick":
+                self.tick(*args)
+            elif action == "stop":
+                self.stop()
+            else:
+                self.step(action)
+            processed += 1
+
+        if processed:
+            self._snapshot = GameSnapshot(self)
+        return processed
 
     def spawn_tetromino(self, tetromino: object, x=3, y=0) -> None:
         piece_grid = tetromino.grid
@@ -242,18 +417,26 @@ class Tetris:
                         if [i, j] == [1, 1]:
                             tetromino.rotate_point = (board_y, board_x)
                         tetromino.tiles_pos.append((board_y, board_x))
-                        if self._board[board_y, board_x] != 0:
-                            self._running = False
+                        if self._is_occupied(board_y, board_x):
+                            self.stop()
                             self._board = np.zeros((20, 10), dtype=int)
                             self.is_game_over = True
 
-        self._tetrominos.append(self._current_tetromino)
-        self.render()
+        if self.is_game_over:
+            self.render()
+        else:
+            self.draw_tetromino(tetromino, [])
 
     def respawn_tetromino(self) -> None:
         self._current_tetromino.is_set = True
-        self.clear_line()
+        self._settled.place(
+            self._current_tetromino.tiles_pos,
+            PIECES_INDEX[self._current_tetromino.piece_type],
+        )
+        lines_cleared = self.clear_line()
         self._current_tetromino = Tetromino(self._bag.choose())
+        if lines_cleared:
+            self.render()
         self.spawn_tetromino(self._current_tetromino)
 
     def check_tetromino(self, new_positions: list, direction: str) -> bool:
@@ -265,16 +448,36 @@ class Tetris:
                 return False
             if not (0 <= y < self._height and 0 <= x < self._width):
                 return False
-            if y < self._height and direction == "down" and self._board[y, x] != 0:
+            if y < self._height and direction == "down" and self._is_occupied(y, x):
                 self.respawn_tetromino()
                 return False
-            if self._board[y, x] != 0:
+            if self._is_occupied(y, x):
                 return False
         return True
 
+    def add_garbage(self, holes: list[int]) -> None:
+        # One garbage row per hole column, pushed in from the bottom
+        if not holes or self.is_game_over:
+            return
+        if self._events is not None:
+            self._events.append((self._frame, GARBAGE_EVENT))
+            self._garbage.append(tuple(holes))
+        rows = np.full((len(holes), self._width), GARBAGE, dtype=np.uint8)
+        rows[np.arange(len(holes)), holes] = 0
+        self._settled.push_rows(rows)
+        if self._settled.collides(self._current_tetromino.tiles_pos):
+            self.stop()
+            self.is_game_over = True
+        self.render()
+
+    def _is_occupied(self, y: int, x: int) -> bool:
+        return self._settled.is_occupied(y, x)
+
     def move_tetromino(self, direction: str) -> None:
         if self.is_game_over:
             return
+        if self._events is not None:
+            self._events.append((self._frame, ACTIONS.index(direction)))
         direction_map = {"right": (0, 1), "left": (0, -1), "down": (1, 0)}
 
         dx, dy = direction_map[direction]
@@ -285,40 +488,65 @@ class Tetris:
                 new_rotate_point = (x + dx, y + dy)
 
         if self.check_tetromino(new_positions, direction):
+            old_positions = self._current_tetromino.tiles_pos
             self._current_tetromino.tiles_pos = new_positions
             if new_rotate_point:
                 self._current_tetromino.rotate_point = new_rotate_point
-
-        self.render()
-
-    def clear_line(self) -> None:
-        line_counts = {y: 0 for y in range(20)}
-        for tetromino in self._tetrominos:
-            if tetromino.is_set:
-                for y, _ in tetromino.tiles_pos:
-                    line_counts[y] += 1
-
-        lines_to_clear = [y for y, count in line_counts.items() if count == 10]
-        if not lines_to_clear:
+            self.draw_tetromino(self._current_tetromino, old_positions)
+
+    def drop_distance(self, tiles_pos: list | None = None) -> int:
+        if tiles_pos is None:
+            tiles_pos = self._current_tetromino.tiles_pos
+        heights = self._settled.heights
+        distance = self._height
+        for y, x in tiles_pos:
+            top = self._height - heights[x]
+            if y >= top:
+                return self._step_distance(tiles_pos)
+            distance = min(distance, top - 1 - y)
+        return distance
+
+    def _step_distance(self, tiles_pos: list) -> int:
+        # Tucked under an overhang, so the column heights do not apply
+        distance = 0
+        while not self._settled.collides([(y + distance + 1, x) for y, x in tiles_pos]):
+            distance += 1
+        return distance
+
+    def hard_drop(self) -> None:
+        if self.is_game_over:
+            return
+        if self._events is not None:
+            self._events.append((self._frame, ACTIONS.index("drop")))
+
+        distance = self.drop_distance()
+        if distance:
+            tetromino = self._current_tetromino
+            old_positions = tetromino.tiles_pos
+            tetromino.tiles_pos = [(y + distance, x) for y, x in old_positions]
+            rotate_y, rotate_x = tetromino.rotate_point
+            tetromino.rotate_point = (rotate_y + distance, rotate_x)
+            self.draw_tetromino(tetromino, old_positions)
+        self.respawn_tetromino()
+
+    def clear_line(self) -> bool:
+        lines_to_clear_amount = self._settled.clear_full_rows()
+        if not lines_to_clear_amount:
             return False
 
-        for line in sorted(lines_to_clear):
-            self._board[line] = [CLEARLINE_NUM] * self._width
-            # self.display()
-
-            for tetromino in self._tetrominos:
-                if tetromino.is_set:
-                    new_tiles_pos = []
-                    for tile_y, tile_x in tetromino.tiles_pos:
-                        if tile_y != line:
-                            if tile_y < line:
-                                new_tiles_pos.append((tile_y + 1, tile_x))
-                            else:
-                                new_tiles_pos.append((tile_y, tile_x))
-                    tetromino.tiles_pos = new_tiles_pos
-
-        # time.sleep(self._drop_interval)
-        lines_to_clear_amount = len(lines_to_clear)
+        self.update_progress(lines_to_clear_amount)
+        # Stamped with both the tick and the wall time so results are exact
+        # headless and in the GUI. Only the latest clear is kept: goals are
+        # checked after every clear, so a longer history is never needed
+        self._last_clear = (
+            self._frame,
+            self.elapsed_ns,
+            self._total_clear_line,
+            lines_to_clear_amount,
+        )
+        return True
+
+    def update_progress(self, lines_to_clear_amount: int) -> None:
         self._total_clear_line += lines_to_clear_amount
         self._level_progression += lines_to_clear_amount
         if self._level_progression >= 10:
@@ -326,19 +554,27 @@ class Tetris:
             self._level_progression = self._level_progression % 10
         self._drop_interval = self.cal_drop_interval(self._level)
         self._score += self.cal_score(self._level, lines_to_clear_amount)
-        return
 
     def rotate_tetromino(self, direction: str):
         if self.is_game_over:
             return
-        self._current_tetromino.rotate(self._board, direction)
-        self.render()
+        if self._events is not None:
+            self._events.append((self._frame, ACTIONS.index(direction)))
+        old_positions = self._current_tetromino.tiles_pos
+        self._current_tetromino.rotate(self._settled, direction)
+        if self._current_tetromino.tiles_pos is not old_positions:
+            self.draw_tetromino(self._current_tetromino, old_positions)
 
     def render(self) -> None:
-        self._board = np.zeros((self._height, self._width), dtype=int)
-        for piece in self._tetrominos:
-            for tile in piece.tiles_pos:
-                self._board[tile[0], tile[1]] = PIECES_INDEX[piece.piece_type]
+        self._board = self._settled.colors.astype(int)
+        self.draw_tetromino(self._current_tetromino, [])
+
+    def draw_tetromino(self, tetromino: Tetromino, old_positions: list) -> None:
+        for y, x in old_positions:
+            self._board[y, x] = 0
+        piece_index = PIECES_INDEX[tetromino.piece_type]
+        for y, x in tetromino.tiles_pos:
+            self._board[y, x] = piece_index
 
     def display(self):
         print("\033[?25l", end="")
@@ -368,8 +604,61 @@ class Tetris:
     def bag(self):
         return self._bag
 
+    @property
+    def snapshot(self) -> GameSnapshot:
+        return self._snapshot
+
+    @property
+    def play_time(self) -> float:
+        return self._play_time
+
+    @property
+    def elapsed_ns(self) -> int:
+        end_ns = self._end_ns if self._end_ns is not None else self._timer()
+        return end_ns - self._start_ns
+
+    @property
+    def last_clear(self) -> tuple[int, int, int, int] | None:
+        # (frame, elapsed ns, total lines after it, lines cleared)
+        return self._last_clear
+
+    @property
+    def ghost_positions(self) -> list[tuple[int, int]]:
+        distance = self.drop_distance()
+        return [(y + distance, x) for y, x in self._current_tetromino.tiles_pos]
+
+    @property
+    def seed(self) -> int | random.Random | None:
+        return self._seed
+
+    @property
+    def start_level(self) -> int:
+        return self._start_level
+
+    @property
+    def frame(self) -> int:
+        return self._frame
+
+    @property
+    def events(self) -> list[tuple[int, int]] | None:
+        return self._events
+
+    @property
+    def garbage(self) -> list[tuple[int, ...]] | None:
+        return self._garbage
+
+    @property
+    def settled(self) -> ArrayBoard | BitBoard:
+        return self._settled
+
+    @property
+    def current_tetromino(self) -> Tetromino:
+        return self._current_tetromino
+
 
 def play_tetris():
+    import keyboard
+
     os.system("cls" if os.name == "nt" else "clear")
     game = Tetris()
 
@@ -400,6 +689,7 @@ def play_tetris():
                     game.rotate_tetromino("CCW")
 
             last_keys = current_keys
+            game.tick()
             time.sleep(0.05)
 
     except KeyboardInterrupt:
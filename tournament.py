@@ -0,0 +1,123 @@
+import argparse
+import importlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from modes import MODES, GameMode
+from tetris import ACTIONS, Tetris
+
+FRAME_TIME = 1 / 60
+MAX_FRAMES = 60 * 60 * 10
+
+
+def random_policy(game: Tetris) -> str:
+    return random.choice(ACTIONS)
+
+
+def run_game(
+    seed: int,
+    policy,
+    max_frames: int = MAX_FRAMES,
+    level: int = 1,
+    mode: GameMode | None = None,
+) -> dict:
+    random.seed(seed)
+    mode = mode or GameMode()
+    game = mode.new_game(level=level, seed=seed)
+    start_time = time.perf_counter()
+
+    frame = 0
+    while frame < max_frames and not mode.is_finished(game):
+        action = policy(game)
+        if action is not None:
+            game.step(action)
+        game.tick(FRAME_TIME)
+        frame += 1
+
+    finish = mode.finish(game)
+    return {
+        "seed": seed,
+        "score": game.score,
+        "lines": game.total_clear_line,
+        "level": game.level,
+        "frames": frame,
+        "duration": frame * FRAME_TIME,
+        "wall_time": time.perf_counter() - start_time,
+        "game_over": game.is_game_over,
+        "won": mode.is_won(game),
+        "finish_frame": finish[0] if finish else None,
+    }
+
+
+def run_tournament(
+    seeds: list[int],
+    policy,
+    processes: int | None = None,
+    max_frames: int = MAX_FRAMES,
+    level: int = 1,
+    mode: GameMode | None = None,
+) -> dict:
+    processes = processes or os.cpu_count() or 1
+    # Few large chunks keep the pool busy without per-game IPC overhead
+    chunksize = max(1, len(seeds) // (processes * 4))
+    play = partial(
+        run_game, policy=policy, max_frames=max_frames, level=level, mode=mode
+    )
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = list(executor.map(play, seeds, chunksize=chunksize))
+
+    return {
+        "results": results,
+        "summary": summarize(results),
+        "processes": processes,
+        "wall_time": time.perf_counter() - start_time,
+    }
+
+
+def summarize(results: list[dict]) -> dict:
+    if not results:
+        return {"games": 0}
+
+    summary = {"games": len(results)}
+    for key in ("score", "lines", "level", "duration"):
+        values = [result[key] for result in results]
+        summary[f"mean_{key}"] = sum(values) / len(values)
+        summary[f"max_{key}"] = max(values)
+    summary["wins"] = sum(result["won"] for result in results)
+    summary["best_seed"] = max(results, key=lambda result: result["score"])["seed"]
+    return summary
+
+
+def load_policy(spec: str):
+    module_name, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run headless Tetris games")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    parser.add_argument("--policy", default="tournament:random_policy")
+    parser.add_argument("--mode", choices=MODES, default="classic")
+    args = parser.parse_args()
+
+    tournament = run_tournament(
+        list(range(args.seed, args.seed + args.games)),
+        load_policy(args.policy),
+        processes=args.processes,
+        max_frames=args.max_frames,
+        mode=MODES[args.mode](),
+    )
+    for key, value in tournament["summary"].items():
+        print(f"{key}: {value}")
+    print(f"wall_time: {tournament['wall_time']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import random
+from collections import OrderedDict
+from placement import board_rows
+from tetris import HEIGHT, PIECES, WIDTH
+
+TABLE_SIZE = 1 << 16
+ZOBRIST_SEED = 2024
+
+_zobrist_random = random.Random(ZOBRIST_SEED)
+CELL_KEYS = [
+    [_zobrist_random.getrandbits(64) for _ in range(WIDTH)] for _ in range(HEIGHT)
+]
+PIECE_KEYS = {
+    piece_type: [_zobrist_random.getrandbits(64) for _ in range(4)]
+    for piece_type in PIECES
+}
+POSITION_KEYS = [
+    [_zobrist_random.getrandbits(64) for _ in range(WIDTH + 4)]
+    for _ in range(HEIGHT + 4)
+]
+BAG_KEYS = [_zobrist_random.getrandbits(64) for _ in range(len(PIECES))]
+
+
+def build_row_keys() -> list[list[int]]:
+    # ROW_KEYS[y][mask] is the XOR of the cell keys set in that row mask
+    row_keys = []
+    for y in range(HEIGHT):
+        keys = [0] * (1 << WIDTH)
+        for mask in range(1, 1 << WIDTH):
+            lowest_bit = mask & -mask
+            keys[mask] = (
+                keys[mask ^ lowest_bit] ^ CELL_KEYS[y][lowest_bit.bit_length() - 1]
+            )
+        row_keys.append(keys)
+    return row_keys
+
+
+ROW_KEYS = build_row_keys()
+
+
+def board_hash(rows: tuple[int, ...]) -> int:
+    key = 0
+    for row_keys, row in zip(ROW_KEYS, rows):
+        key ^= row_keys[row]
+    return key
+
+
+def place_hash(key: int, tiles_pos: tuple) -> int:
+    for y, x in tiles_pos:
+        key ^= CELL_KEYS[y][x]
+    return key
+
+
+def state_hash(
+    rows: tuple[int, ...],
+    piece_type: str | None = None,
+    rotate_index: int = 0,
+    rotate_point: tuple[int, int] | None = None,
+    bag_index: int = 0,
+) -> int:
+    key = board_hash(rows) ^ BAG_KEYS[bag_index % len(BAG_KEYS)]
+    if piece_type is not None:
+        key ^= PIECE_KEYS[piece_type][rotate_index]
+    if rotate_point is not None:
+        key ^= POSITION_KEYS[rotate_point[0] + 2][rotate_point[1] + 2]
+    return key
+
+
+def game_hash(game) -> int:
+    tetromino = game.current_tetromino
+    return state_hash(
+        board_rows(game.settled),
+        tetromino.piece_type,
+        tetromino.rotate_index,
+        tetromino.rotate_point,
+        game.bag.current_index,
+    )
+
+
+class TranspositionTable:
+    def __init__(self, maxsize: int = TABLE_SIZE) -> None:
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: int, default=None):
+        if key not in self._entries:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: int, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)